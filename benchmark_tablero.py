@@ -0,0 +1,162 @@
+"""
+MATCH DE IMPRO - BENCHMARK DEL MOTOR DE TABLERO
+------------------------------------------------------------------------------
+Mide el costo de render del tablero sin abrir ventanas (DestinoGrabacion /
+DestinoPillow), para comparar versiones del motor entre sí.
+
+Por cada caso (equipos x resolución x fondo/logo/outline) reporta:
+  - ítems creados y ms del primer fotograma (escena en frío),
+  - ms y operaciones de un redibujo completo sin cambios,
+  - ms y operaciones de un tick del reloj y de un cambio de puntaje,
+  - ms de un cambio de tamaño (redimensionado real de imágenes),
+  - memoria asignada por fotograma (tracemalloc),
+  - ms del primer fotograma de una salida extra que comparte cachés (mismo y otro tamaño),
+  - opcionalmente, ms de rasterizar el fotograma con Pillow (--raster).
+
+Uso:
+    python benchmark_tablero.py --salida bench.json
+    python benchmark_tablero.py --salida nuevo.json --comparar bench.json
+------------------------------------------------------------------------------
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import PIL
+from PIL import Image, ImageDraw
+
+from match_director_source import EstadoTablero, MotorTablero, DestinoGrabacion, DestinoPillow
+
+RESOLUCIONES = {"720p": (1280, 720), "1080p": (1920, 1080), "4K": (3840, 2160)}
+EQUIPOS = [2, 3, 4, 6, 8, 12, 16]
+
+def crear_assets(carpeta):
+    """Genera un fondo JPEG grande y un logo PNG con transparencia (sin depender de archivos del usuario)."""
+    fondo = os.path.join(carpeta, "fondo.jpg"); logo = os.path.join(carpeta, "logo.png")
+    img = Image.linear_gradient("L").resize((4000, 2667)).convert("RGB")
+    img = Image.merge("RGB", (img.split()[0], img.rotate(90).resize(img.size).split()[0], img.split()[0]))
+    img.save(fondo, quality=90)
+    lg = Image.new("RGBA", (1200, 600), (0, 0, 0, 0))
+    ImageDraw.Draw(lg).rounded_rectangle((20, 20, 1180, 580), radius=80, fill=(0, 212, 255, 220), outline="white", width=12)
+    lg.save(logo)
+    return fondo, logo
+
+def medir(fn, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter(); fn(); tiempos.append((time.perf_counter() - t0) * 1000)
+    return {"media_ms": round(statistics.mean(tiempos), 4), "p95_ms": round(sorted(tiempos)[int(len(tiempos) * 0.95) - 1 if len(tiempos) > 1 else 0], 4), "max_ms": round(max(tiempos), 4)}
+
+def ops_totales(ops): return sum(ops.values())
+
+def correr_caso(n_equipos, res, fondo, logo, outline, assets, repeticiones, raster):
+    w, h = RESOLUCIONES[res]
+    modelo = EstadoTablero(n_equipos=n_equipos)
+    modelo.fondo_path = assets[0] if fondo else None
+    modelo.logo_path = assets[1] if logo else None
+    modelo.var_outline = outline
+    destino = (DestinoPillow if raster else DestinoGrabacion)(w, h)
+    motor = MotorTablero(modelo, destino)
+    r = {"id": f"{n_equipos}eq-{res}-{'F' if fondo else 'f'}{'L' if logo else 'l'}{'O' if outline else 'o'}",
+         "equipos": n_equipos, "resolucion": res, "fondo": fondo, "logo": logo, "outline": outline}
+
+    # 1. Primer fotograma (escena en frío: decodificación, rótulos y creación de ítems)
+    t0 = time.perf_counter(); motor.redibujar_pantalla(); r["frame_inicial_ms"] = round((time.perf_counter() - t0) * 1000, 4)
+    ops = destino.tomar_ops()
+    r["items_creados"] = ops["crear"]; r["items_visibles"] = destino.visibles()
+
+    # 2. Redibujo completo sin cambios (debe ser casi gratis)
+    r["redibujo"] = medir(motor.redibujar_pantalla, repeticiones)
+    r["redibujo"]["ops_por_frame"] = ops_totales(destino.tomar_ops()) / repeticiones
+
+    # 3. Tick del reloj
+    def tick(): modelo.tiempo_restante -= 1; motor.refrescar_timer()
+    r["tick_reloj"] = medir(tick, repeticiones)
+    r["tick_reloj"]["ops_por_frame"] = ops_totales(destino.tomar_ops()) / repeticiones
+
+    # 4. Cambio de puntaje (mod)
+    def punto(): modelo.equipos[0].puntos += 1; motor.refrescar_equipo(0)
+    r["cambio_puntos"] = medir(punto, repeticiones)
+    r["cambio_puntos"]["ops_por_frame"] = ops_totales(destino.tomar_ops()) / repeticiones
+
+    # 5. Cambio de tamaño: cada repetición usa un tamaño nuevo (sin aciertos de caché)
+    tamanos = iter([(w - k - 1, h - k - 1) for k in range(repeticiones)])
+    def redimensionar(): destino.w, destino.h = next(tamanos); motor.redibujar_pantalla()
+    r["redimension"] = medir(redimensionar, repeticiones)
+    r["redimension"]["ops_por_frame"] = ops_totales(destino.tomar_ops()) / repeticiones
+    destino.w, destino.h = w, h; motor.redibujar_pantalla(); destino.tomar_ops()
+
+    # 6. Salida extra (otra ventana) con las cachés del motor principal: sin decodificar de nuevo
+    for nombre, tam in (("mismo_tamano_ms", (w, h)), ("otro_tamano_ms", (w // 2, h // 2))):
+        extra = MotorTablero(modelo, type(destino)(*tam), cache_img=motor.cache_img, cache_rotulos=motor.cache_rotulos)
+        t0 = time.perf_counter(); extra.redibujar_pantalla(); r.setdefault("salida_extra", {})[nombre] = round((time.perf_counter() - t0) * 1000, 4)
+
+    # 7. Memoria asignada por fotograma (redibujo completo + tick)
+    tracemalloc.start()
+    antes = tracemalloc.take_snapshot()
+    for _ in range(repeticiones): motor.redibujar_pantalla(); tick()
+    despues = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    dif = despues.compare_to(antes, "filename")
+    r["alloc_bytes_por_frame"] = round(sum(max(0, d.size_diff) for d in dif) / repeticiones, 1)
+    r["alloc_bloques_por_frame"] = round(sum(max(0, d.count_diff) for d in dif) / repeticiones, 2)
+    destino.tomar_ops()
+
+    # 8. Rasterizado opcional con Pillow
+    if raster: r["raster"] = medir(destino.rasterizar, max(1, repeticiones // 5))
+    return r
+
+def comparar(actual, anterior):
+    previos = {c["id"]: c for c in anterior["casos"]}
+    print(f"\n{'caso':<22}{'métrica':<16}{'antes':>10}{'ahora':>10}{'cambio':>9}")
+    for c in actual["casos"]:
+        p = previos.get(c["id"])
+        if not p: continue
+        for met in ("redibujo", "tick_reloj", "cambio_puntos", "redimension"):
+            a, b = p[met]["media_ms"], c[met]["media_ms"]
+            cambio = f"{(b - a) / a * 100:+.0f}%" if a else "-"
+            print(f"{c['id']:<22}{met:<16}{a:>10.3f}{b:>10.3f}{cambio:>9}")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark del motor de tablero (sin pantalla).")
+    ap.add_argument("--salida", help="Archivo JSON donde guardar los resultados")
+    ap.add_argument("--comparar", help="JSON de una corrida anterior para comparar")
+    ap.add_argument("--repeticiones", type=int, default=20)
+    ap.add_argument("--equipos", type=int, nargs="+", default=EQUIPOS)
+    ap.add_argument("--resoluciones", nargs="+", default=list(RESOLUCIONES), choices=list(RESOLUCIONES))
+    ap.add_argument("--raster", action="store_true", help="Medir también el rasterizado con Pillow")
+    args = ap.parse_args(argv)
+
+    casos = []
+    with tempfile.TemporaryDirectory() as carpeta:
+        assets = crear_assets(carpeta)
+        for n in args.equipos:
+            for res in args.resoluciones:
+                for fondo in (False, True):
+                    for logo in (False, True):
+                        for outline in (False, True):
+                            c = correr_caso(n, res, fondo, logo, outline, assets, args.repeticiones, args.raster)
+                            casos.append(c)
+                            print(f"{c['id']:<22} inicial {c['frame_inicial_ms']:8.2f} ms  items {c['items_creados']:3d}  "
+                                  f"redibujo {c['redibujo']['media_ms']:7.3f} ms ({c['redibujo']['ops_por_frame']:.0f} ops)  "
+                                  f"tick {c['tick_reloj']['media_ms']:6.3f} ms ({c['tick_reloj']['ops_por_frame']:.0f} ops)  "
+                                  f"resize {c['redimension']['media_ms']:8.2f} ms  salida extra {c['salida_extra']['mismo_tamano_ms']:7.2f} ms")
+
+    resultado = {"version": 1, "fecha": time.strftime("%Y-%m-%d %H:%M:%S"), "python": sys.version.split()[0],
+                 "pillow": PIL.__version__, "plataforma": platform.platform(), "repeticiones": args.repeticiones, "casos": casos}
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f: json.dump(resultado, f, indent=1, ensure_ascii=False)
+        print(f"\nResultados guardados en {args.salida}")
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f: comparar(resultado, json.load(f))
+    return resultado
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+MATCH DE IMPRO - CLIENTE DE PRUEBA DEL CONTROL REMOTO
+------------------------------------------------------------------------------
+Envía comandos al control remoto UDP del Director (ServidorControl) y mide la
+latencia de ida y vuelta de cada uno. Sirve para probar un pad o un teléfono
+antes del show y para verificar todo el camino sin hardware.
+
+Con --simular no hace falta abrir el programa: levanta en este mismo proceso un
+servidor y un "hilo de Tk" de mentira que drena la cola por lotes cada 5 ms sobre
+un EstadoTablero, igual que la aplicación y con el mismo despachador de comandos
+(EstadoTablero.ejecutar_comando).
+
+Uso:
+    python cliente_control.py punto equipo=0 d=1
+    python cliente_control.py estado
+    python cliente_control.py --host 192.168.1.20 --token XXXX punto equipo=1   (Director abierto con --lan)
+    python cliente_control.py --simular --repeticiones 200 --rafaga 32
+------------------------------------------------------------------------------
+"""
+
+import argparse
+import json
+import os
+import statistics
+import threading
+import time
+
+from match_director_source import EstadoTablero, ServidorControl, ClienteControl, BibliotecaPresets, DIR_DATOS
+
+def valor(texto):
+    """'3' -> 3, '-1' -> -1, 'ROJO' -> 'ROJO' (para los argumentos clave=valor)."""
+    try: return int(texto)
+    except ValueError: return texto
+
+class Simulador:
+    """Servidor real + bucle de drenado que imita al hilo de Tk, aplicando los comandos a un EstadoTablero."""
+    def __init__(self, n_equipos=4):
+        self.modelo = EstadoTablero(n_equipos=n_equipos)
+        self.modelo.presets = BibliotecaPresets(os.path.join(DIR_DATOS, "presets")) # Los del Director, si existen
+        self.servidor = ServidorControl(puerto=0) # Puerto libre elegido por el sistema
+        self.lotes = 0; self.activo = True
+
+    def bucle(self):
+        while self.activo:
+            if self.servidor.drenar(self.modelo.ejecutar_comando): self.lotes += 1 # Un lote = un redibujo en la aplicación
+            time.sleep(0.005)
+
+    def iniciar(self):
+        self.servidor.iniciar()
+        threading.Thread(target=self.bucle, daemon=True).start()
+        return self.servidor.puerto
+
+    def cerrar(self): self.activo = False; self.servidor.cerrar()
+
+def resumen(nombre, tiempos):
+    if not tiempos: return f"{nombre}: sin respuestas"
+    ordenados = sorted(tiempos)
+    return (f"{nombre}: media {statistics.mean(tiempos):.3f} ms · p95 {ordenados[max(0, int(len(ordenados) * 0.95) - 1)]:.3f} ms"
+            f" · máx {ordenados[-1]:.3f} ms ({len(tiempos)} comandos)")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Cliente de prueba del control remoto UDP.")
+    ap.add_argument("comando", nargs="?", default="ping", help="ping, estado, punto, falta, nombre, iniciar, pausar, tiempo, sonido, preset")
+    ap.add_argument("args", nargs="*", help="Argumentos clave=valor (ej. equipo=0 d=1)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--puerto", type=int, default=ServidorControl.PUERTO)
+    ap.add_argument("--token", help="Token del control remoto en red (~/.match_director/control_token.txt en la máquina del Director)")
+    ap.add_argument("--repeticiones", type=int, default=1, help="Envíos uno a uno (se espera cada respuesta)")
+    ap.add_argument("--rafaga", type=int, default=0, help="Además, N envíos seguidos sin esperar")
+    ap.add_argument("--simular", action="store_true", help="Servidor y tablero simulados en este proceso")
+    args = ap.parse_args(argv)
+    datos = dict((k, valor(v)) for k, v in (a.split("=", 1) for a in args.args))
+
+    sim = Simulador() if args.simular else None
+    puerto = sim.iniciar() if sim else args.puerto
+    cliente = ClienteControl(args.host, puerto, token=args.token)
+    try:
+        rtt, srv = [], []
+        for _ in range(args.repeticiones):
+            r = cliente.enviar(args.comando, **datos)
+            rtt.append(r['rtt_ms']); srv.append(r.get('ms', 0.0))
+        if args.repeticiones == 1: print(json.dumps(r, ensure_ascii=False))
+        else: print(resumen("Ida y vuelta", rtt)); print(resumen("En el servidor", srv))
+
+        if args.rafaga:
+            lotes_antes = sim.lotes if sim else 0
+            t0 = time.perf_counter()
+            for _ in range(args.rafaga): cliente.mandar(args.comando, **datos)
+            respuestas = [cliente.recibir() for _ in range(args.rafaga)]
+            print(resumen(f"Ráfaga de {args.rafaga}", [(r['t'] - t0) * 1000 for r in respuestas]))
+            errores = [r for r in respuestas if not r['ok']]
+            if errores: print(f"  {len(errores)} rechazados: {errores[0].get('error')}")
+            if sim: print(f"  aplicada en {sim.lotes - lotes_antes} lote(s) de drenado (= redibujos en la aplicación)")
+        if sim:
+            m = sim.modelo
+            print(f"Estado final: {[eq.a_dict() for eq in m.equipos]} · reloj {m.restante()} s{' (corriendo)' if m.corriendo else ''}"
+                  f"{f' · sonidos {dict(m.disparos)}' if m.disparos else ''}")
+    except OSError as e:
+        print(f"Sin respuesta de {args.host}:{puerto} ({e}). ¿Está abierto el Director?")
+    finally:
+        cliente.cerrar()
+        if sim: sim.cerrar()
+
+if __name__ == "__main__":
+    main()
@@ -12,41 +12,820 @@ Usted es libre de compartir y adaptar este código siempre que reconozca la auto
 ------------------------------------------------------------------------------
 """
 
+import time
+T_INICIO = time.perf_counter() # Referencia para el reporte de arranque (--tiempos)
 import tkinter as tk
-from tkinter import filedialog, messagebox, ttk, colorchooser, font
-from PIL import Image, ImageTk # Librería Pillow para manejo avanzado de imágenes
-import pygame # Librería para efectos de sonido
+from tkinter import filedialog, messagebox, simpledialog, ttk, colorchooser, font
+from PIL import Image, ImageTk, ImageDraw, ImageFont # Librería Pillow para manejo avanzado de imágenes
 import sys
 import os
+import bisect
+import csv
+import hmac
+import io
+import ipaddress
+import json
+import math
+import mmap
+import queue
+import secrets
+import socket
+import struct
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from collections import OrderedDict, Counter, deque
 
-# --- CONFIGURACIÓN DE AUDIO ---
-# Intentamos iniciar el mixer. Si falla (ej. no hay tarjeta de sonido), el programa sigue funcionando sin audio.
-AUDIO_ENABLED = False
-try:
-    pygame.mixer.init()
-    AUDIO_ENABLED = True
-except:
-    print("Advertencia: No se detectó dispositivo de audio. El modo sonido estará desactivado.")
+pygame = None # Librería para efectos de sonido: se importa al iniciar el audio (ver importar_pygame)
 
-class ImproMatchApp:
+def importar_pygame():
+    """Importa pygame la primera vez que se necesita (cuesta cientos de ms; se hace en segundo plano)."""
+    global pygame
+    if pygame is None:
+        os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+        import pygame as _pygame
+        pygame = _pygame
+    return pygame
+
+# --- ESTADÍSTICAS DE TIEMPOS ---
+class CronometroArranque:
+    """Tiempo de cada etapa del arranque, desde T_INICIO (antes de importar Tk y Pillow)."""
+    OBJETIVO_MS = 300 # Meta: tablero visible en menos de 300 ms
+
+    def __init__(self, t0=T_INICIO):
+        self.t0 = t0; self.ultimo = t0
+        self.etapas = []
+
+    def marca(self, etapa):
+        ahora = time.perf_counter()
+        self.etapas.append((etapa, (ahora - self.ultimo) * 1000)); self.ultimo = ahora
+
+    def total_ms(self): return (self.ultimo - self.t0) * 1000
+
+    def reporte(self):
+        lineas = [f"  {etapa:<28}{ms:8.1f} ms" for etapa, ms in self.etapas]
+        estado = "OK" if self.total_ms() <= self.OBJETIVO_MS else f"supera la meta de {self.OBJETIVO_MS} ms"
+        return "Arranque:\n" + "\n".join(lineas) + f"\n  {'TOTAL':<28}{self.total_ms():8.1f} ms ({estado})"
+
+class EstadisticasTick:
+    """Registra el desfase (ms) entre el instante previsto de cada tick del reloj y el real.
+
+    También sirve para otras latencias (ej. disparo de sonidos) cambiando 'titulo' y 'unidad'.
+    """
+    def __init__(self, max_muestras=20000, titulo="Jitter", unidad="ticks"):
+        self.muestras = deque(maxlen=max_muestras)
+        self.titulo = titulo; self.unidad = unidad
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.muestras.clear(); self.n = 0; self.suma = 0.0; self.maximo = 0.0
+
+    def registrar(self, desfase_ms):
+        self.muestras.append(desfase_ms); self.n += 1; self.suma += desfase_ms
+        self.maximo = max(self.maximo, desfase_ms)
+
+    def percentil(self, p):
+        if not self.muestras: return 0.0
+        orden = sorted(self.muestras)
+        return orden[min(len(orden) - 1, int(len(orden) * p / 100))]
+
+    def resumen(self):
+        if not self.n: return f"{self.titulo}: sin datos"
+        return f"{self.titulo}: media {self.suma / self.n:.2f} ms · p95 {self.percentil(95):.2f} ms · máx {self.maximo:.2f} ms ({self.n} {self.unidad})"
+
+    def a_dict(self):
+        return {'n': self.n, 'media': round(self.suma / self.n, 4) if self.n else 0.0, 'p50': round(self.percentil(50), 4),
+                'p95': round(self.percentil(95), 4), 'max': round(self.maximo, 4)}
+
+class Histograma:
+    """Cubetas fijas (escala casi logarítmica): registrar no guarda muestras y cuesta una bisección."""
+    LIMITES_MS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 33, 66, 133, 266, 533)
+    LIMITES_ITEMS = (25, 50, 100, 150, 200, 300, 500)
+
+    def __init__(self, limites=LIMITES_MS):
+        self.limites = limites
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.cubetas = [0] * (len(self.limites) + 1); self.n = 0; self.suma = 0.0; self.maximo = 0.0
+
+    def registrar(self, v):
+        self.cubetas[bisect.bisect_left(self.limites, v)] += 1; self.n += 1; self.suma += v
+        if v > self.maximo: self.maximo = v
+
+    def percentil(self, p):
+        """Cota superior de la cubeta donde cae el percentil 'p' (o el máximo, si es la última)."""
+        objetivo = self.n * p / 100; acum = 0
+        for k, c in enumerate(self.cubetas):
+            acum += c
+            if c and acum >= objetivo: return min(self.limites[k], self.maximo) if k < len(self.limites) else self.maximo
+        return 0.0
+
+    def a_dict(self):
+        cubetas = {f"<={l}": c for l, c in zip(self.limites, self.cubetas)}; cubetas[f">{self.limites[-1]}"] = self.cubetas[-1]
+        return {'n': self.n, 'media': round(self.suma / self.n, 4) if self.n else 0.0, 'p50': self.percentil(50),
+                'p95': self.percentil(95), 'max': round(self.maximo, 4), 'cubetas': cubetas}
+
+class Perfilador:
+    """Instrumentación opcional del camino caliente (pestaña DIAGNÓSTICO).
+
+    Encender reemplaza, en cada objeto, los métodos a medir por una envoltura que registra su
+    duración en un Histograma; apagar devuelve los originales. Así, con el perfilador apagado el
+    camino caliente es exactamente el de siempre (cero costo). Todo corre en el hilo de Tk.
+    """
     def __init__(self):
-        # Configuración de la Ventana Principal (Panel de Control)
-        self.root = tk.Tk()
-        self.root.title("Match Impro Director - Acción Impro 2026")
-        self.root.geometry("540x950")
-        self.root.configure(bg="#222") # Tema Oscuro
-        
+        self.activo = False
+        self.envueltos = [] # (objeto, atributo, original, era_del_objeto)
+        self.tiempos = {}   # nombre -> Histograma (ms por llamada)
+        self.conteos = Counter()
+        self.items = Histograma(Histograma.LIMITES_ITEMS) # Ítems del canvas por fotograma
+        self.lag = Histograma()                           # Retraso del bucle de eventos de Tk
+        self.t_inicio = None
+
+    def _envolver(self, obj, attr, envoltura):
+        if any(o is obj and a == attr for o, a, _, _ in self.envueltos): return # Caché compartida entre salidas
+        original = getattr(obj, attr)
+        self.envueltos.append((obj, attr, original, attr in vars(obj)))
+        setattr(obj, attr, envoltura(original))
+
+    def medir(self, obj, attr, nombre):
+        reloj = time.perf_counter
+        def envoltura(original):
+            hist = self.tiempos.setdefault(nombre, Histograma())
+            def medido(*args, **kw):
+                t0 = reloj()
+                try: return original(*args, **kw)
+                finally: hist.registrar((reloj() - t0) * 1000)
+            return medido
+        self._envolver(obj, attr, envoltura)
+
+    def contar(self, obj, attr, nombre):
+        conteos = self.conteos
+        def envoltura(original):
+            def contado(*args, **kw):
+                conteos[nombre] += 1
+                return original(*args, **kw)
+            return contado
+        self._envolver(obj, attr, envoltura)
+
+    def encender(self):
+        self.activo = True
+        if self.t_inicio is None: self.t_inicio = time.time()
+
+    def apagar(self):
+        for obj, attr, original, propio in reversed(self.envueltos):
+            if propio: setattr(obj, attr, original)
+            else: delattr(obj, attr) # Vuelve a resolverse el método de la clase
+        self.envueltos = []; self.activo = False
+
+    def reiniciar(self):
+        for h in self.tiempos.values(): h.reiniciar()
+        self.conteos.clear(); self.items.reiniciar(); self.lag.reiniciar()
+        self.t_inicio = time.time() if self.activo else None
+
+    def a_dict(self, extras=None):
+        """Todo lo medido, en un dict listo para JSON ('extras': otras estadísticas del programa)."""
+        frames = self.tiempos['render_frame'].n if 'render_frame' in self.tiempos else 0
+        return {'inicio': time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.t_inicio)) if self.t_inicio else None,
+                'duracion_s': round(time.time() - self.t_inicio, 1) if self.t_inicio else 0,
+                'tiempos_ms': {nombre: h.a_dict() for nombre, h in self.tiempos.items()},
+                'conteos': dict(self.conteos),
+                'solicitudes_por_frame': round(self.conteos['solicitar_redibujo'] / frames, 3) if frames else None,
+                'items_canvas': self.items.a_dict(), 'lag_tk_ms': self.lag.a_dict(), 'otros': extras or {}}
+
+    def filas(self, extras=None):
+        """(métrica, n, media, p50, p95, máx) por histograma y estadística extra, para la tabla y el CSV."""
+        d = self.a_dict(extras)
+        series = list(d['tiempos_ms'].items()) + [('items_canvas (ítems)', d['items_canvas']), ('lag_tk', d['lag_tk_ms'])] + list(d['otros'].items())
+        return [(nombre, h['n'], h['media'], h['p50'], h['p95'], h['max']) for nombre, h in series]
+
+    def exportar(self, ruta, extras=None):
+        """Guarda en JSON o, si la ruta termina en .csv, una fila por métrica (más contadores)."""
+        if ruta.lower().endswith(".csv"):
+            with open(ruta, "w", newline="", encoding="utf-8") as f:
+                w = csv.writer(f)
+                w.writerow(["metrica", "n", "media", "p50", "p95", "max"])
+                w.writerows(self.filas(extras))
+                for nombre, n in sorted(self.conteos.items()): w.writerow([f"conteo:{nombre}", n, "", "", "", ""])
+        else:
+            with open(ruta, "w", encoding="utf-8") as f: json.dump(self.a_dict(extras), f, indent=1, ensure_ascii=False)
+
+# --- MOTOR DE SONIDO ---
+class MotorSonido:
+    """Mezclador de baja latencia con frecuencia, buffer y canales configurables.
+
+    Cada slot tiene un canal reservado: Channel.play() corta lo que sonaba en ese canal sin
+    tener que buscar y detener el sonido en todos los canales (como hace Sound.stop()).
+    """
+    def __init__(self, frecuencia=44100, buffer=256, canales=2, slots=6):
+        self.frecuencia = frecuencia # Hz
+        self.buffer = buffer         # Muestras por bloque: menor = menos latencia, más riesgo de cortes
+        self.canales = canales       # 1 = mono, 2 = estéreo
+        self.slots = slots
+        self.activo = False
+        self.canal_slot = []
+        self.stream_actual = None   # Ruta cargada en pygame.mixer.music
+        self.latencia = EstadisticasTick(titulo="Disparo", unidad="disparos")
+
+    def iniciar(self):
+        """(Re)inicia el mezclador con los parámetros actuales. Si falla (ej. no hay tarjeta de sonido), el programa sigue sin audio."""
+        try:
+            importar_pygame()
+            if pygame.mixer.get_init(): pygame.mixer.quit()
+            pygame.mixer.init(frequency=self.frecuencia, size=-16, channels=self.canales, buffer=self.buffer)
+            pygame.mixer.set_num_channels(self.slots + 8)
+            pygame.mixer.set_reserved(self.slots)
+            self.canal_slot = [pygame.mixer.Channel(i) for i in range(self.slots)]
+            self.stream_actual = None
+            self.activo = True
+        except Exception:
+            print("Advertencia: No se detectó dispositivo de audio. El modo sonido estará desactivado.")
+            self.activo = False; self.canal_slot = []
+        return self.activo
+
+    def decodificar(self, path):
+        """Decodifica un archivo completo a PCM (pensado para correr en el pool)."""
+        return pygame.mixer.Sound(path)
+
+    def disparar(self, idx, snd, t0):
+        """Reproduce 'snd' en el canal del slot y registra la latencia desde 't0' (perf_counter del callback)."""
+        self.canal_slot[idx].play(snd)
+        self.latencia.registrar((time.perf_counter() - t0) * 1000)
+
+    def disparar_stream(self, path, t0):
+        """Música larga: se lee del disco con pygame.mixer.music en vez de decodificarse entera."""
+        if self.stream_actual != path: pygame.mixer.music.load(path); self.stream_actual = path
+        pygame.mixer.music.play()
+        self.latencia.registrar((time.perf_counter() - t0) * 1000)
+
+    def latencia_buffer_ms(self): return self.buffer / self.frecuencia * 1000
+
+    def resumen(self): return f"{self.latencia.resumen()} + buffer {self.latencia_buffer_ms():.1f} ms"
+
+# --- BIBLIOTECA DE SONIDOS ---
+DIR_DATOS = os.path.join(os.path.expanduser("~"), ".match_director") # Datos persistentes del programa
+
+class BibliotecaSonidos:
+    """Bancos (páginas) de 6 clips guardados en disco, decodificados solo cuando hacen falta.
+
+    Los clips decodificados viven en una caché LRU limitada por 'presupuesto_mb'; los de la página
+    activa nunca se desalojan. Al cambiar de página se precarga la siguiente en segundo plano.
+    Los clips marcados como 'stream' (música de fondo larga) no se decodifican: se reproducen
+    leyendo del disco con pygame.mixer.music.
+    """
+    SLOTS = 6
+    UMBRAL_STREAM = 8 * 1024 * 1024 # Archivos más grandes se marcan como stream al cargarlos
+
+    def __init__(self, ruta, audio, pool=None, en_hilo_ui=None, presupuesto_mb=128):
+        self.ruta = ruta; self.audio = audio; self.pool = pool
+        self.en_hilo_ui = en_hilo_ui or (lambda fn, *args: fn(*args))
+        self.presupuesto_mb = presupuesto_mb
+        self.bancos = [self.banco_vacio("Banco 1")]
+        self.pagina = 0
+        self.decodificados = OrderedDict() # ruta -> (Sound, bytes de PCM)
+        self.en_uso = 0                    # Bytes de PCM decodificado en memoria
+        self.pendientes = {}               # ruta -> callbacks esperando la decodificación
+        self.generacion = 0                # Sube con cada vaciar(): lo decodificado antes es de otro formato
+        self.cargar()
+
+    @classmethod
+    def banco_vacio(cls, nombre):
+        return {'nombre': nombre, 'clips': [{'name': f'FX {i+1}', 'path': None, 'stream': False} for i in range(cls.SLOTS)]}
+
+    def cargar(self):
+        try:
+            with open(self.ruta, encoding="utf-8") as f: datos = json.load(f)
+            bancos = [b for b in datos.get('bancos', []) if len(b.get('clips', [])) == self.SLOTS]
+            if bancos: self.bancos = bancos; self.pagina = min(int(datos.get('pagina', 0)), len(bancos) - 1)
+            self.presupuesto_mb = int(datos.get('presupuesto_mb', self.presupuesto_mb))
+        except (OSError, ValueError): pass # Sin biblioteca previa: banco vacío
+
+    def guardar(self):
+        """Escritura atómica (archivo temporal + os.replace) para no dejar la biblioteca a medias."""
+        try:
+            os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+            tmp = self.ruta + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({'bancos': self.bancos, 'pagina': self.pagina, 'presupuesto_mb': self.presupuesto_mb}, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, self.ruta)
+        except OSError as e: print(f"Advertencia: no se pudo guardar la biblioteca de sonidos: {e}")
+
+    def clips(self, pagina=None): return self.bancos[self.pagina if pagina is None else pagina]['clips']
+
+    def nuevo_banco(self):
+        self.bancos.append(self.banco_vacio(f"Banco {len(self.bancos) + 1}"))
+        return len(self.bancos) - 1
+
+    def es_stream(self, clip): return bool(clip['stream'])
+
+    # Decodificación bajo demanda
+    def obtener(self, path):
+        ent = self.decodificados.get(path)
+        if ent is None: return None
+        self.decodificados.move_to_end(path)
+        return ent[0]
+
+    def pedir(self, path, listo=None):
+        """Asegura que 'path' esté decodificado; 'listo(Sound o None)' se llama en el hilo de Tk."""
+        snd = self.obtener(path)
+        if snd is not None:
+            if listo: listo(snd)
+            return
+        if path in self.pendientes:
+            if listo: self.pendientes[path].append(listo)
+            return
+        self.pendientes[path] = [listo] if listo else []
+        self._decodificar(path)
+
+    def _decodificar(self, path):
+        gen = self.generacion
+        if self.pool is None:
+            try: snd = self.audio.decodificar(path)
+            except Exception: snd = None
+            self._instalar(path, snd, gen); return
+        def hecho(f): self.en_hilo_ui(self._instalar, path, f.result() if f.exception() is None else None, gen)
+        self.pool.submit(self.audio.decodificar, path).add_done_callback(hecho)
+
+    def _instalar(self, path, snd, gen):
+        if gen != self.generacion: # Decodificado para el mezclador anterior: se descarta y se pide de nuevo
+            if path in self.pendientes: self._decodificar(path)
+            return
+        if snd is not None and path not in self.decodificados:
+            nbytes = self.bytes_pcm(snd)
+            self.decodificados[path] = (snd, nbytes); self.en_uso += nbytes
+            self.desalojar()
+        for cb in self.pendientes.pop(path, []):
+            if cb: cb(snd)
+
+    @staticmethod
+    def bytes_pcm(snd):
+        freq, size, canales = pygame.mixer.get_init() or (44100, -16, 2)
+        return int(snd.get_length() * freq * canales * abs(size) // 8)
+
+    def desalojar(self):
+        """Libera los clips menos usados hasta entrar en el presupuesto (nunca los de la página activa)."""
+        fijados = {c['path'] for c in self.clips()}
+        for path in list(self.decodificados):
+            if self.en_uso <= self.presupuesto_mb * 1024 * 1024: break
+            if path in fijados: continue
+            self.en_uso -= self.decodificados.pop(path)[1]
+
+    def olvidar(self, path):
+        ent = self.decodificados.pop(path, None)
+        if ent: self.en_uso -= ent[1]
+
+    def vaciar(self):
+        """Descarta todo lo decodificado (ej. al reiniciar el mezclador con otro formato), también lo que está en curso."""
+        self.decodificados.clear(); self.en_uso = 0; self.generacion += 1
+
+    def ir_a(self, pagina, listo=None):
+        """Activa una página: decodifica sus clips y precarga los de la siguiente en segundo plano."""
+        self.pagina = pagina % len(self.bancos)
+        if not self.audio.activo: return # Sin mezclador (o aún iniciándose) no se puede decodificar
+        for c in self.clips():
+            if c['path'] and not self.es_stream(c): self.pedir(c['path'], listo)
+        if len(self.bancos) > 1:
+            for c in self.clips(self.pagina + 1 if self.pagina + 1 < len(self.bancos) else 0):
+                if c['path'] and not self.es_stream(c): self.pedir(c['path'])
+
+# --- CACHÉ DE IMÁGENES ---
+class CacheImagenes:
+    """Caché LRU acotada de imágenes redimensionadas, indexada por (ruta, tamaño destino, escala).
+
+    Durante una interacción (arrastrar la ventana o un slider) se usa un filtro rápido; la
+    versión LANCZOS definitiva reemplaza a la provisional cuando se pide con rapido=False.
+    Con un 'pool' la decodificación y los LANCZOS corren en segundo plano: los resultados se
+    entregan al hilo de Tk mediante 'en_hilo_ui' (ImageTk solo puede usarse desde ese hilo).
+    Mientras un original no está decodificado, se muestra la variante existente más parecida
+    (p. ej. la de un preset horneado para otra ventana); si el archivo ya no existe, queda esa.
+    """
+    def __init__(self, max_items=12, convertir=None, pool=None, en_hilo_ui=None, al_listo=None):
+        self.max_items = max_items
+        self.convertir = convertir or ImageTk.PhotoImage # PIL -> imagen mostrable (PhotoImage en Tk)
+        self.pool = pool
+        self.en_hilo_ui = en_hilo_ui or (lambda fn, *args: fn(*args))
+        self.al_listo = al_listo       # Aviso cuando llega una variante definitiva
+        self.originales = {}           # ruta -> imagen PIL decodificada
+        self.medidas = {}              # ruta -> tamaño del original conocido sin decodificarlo (presets, cabecera)
+        self.variantes = OrderedDict() # (ruta, tamaño, escala) -> (imagen convertida, es_final)
+        self.pendientes = set()        # Claves con un LANCZOS en curso
+        self.faltantes = set()         # Rutas que no se pudieron leer (ej. pendrive retirado): se avisa una vez
+        self.generacion = 0            # Sube con olvidar(): descarta los resultados del pool que llegan tarde
+
+    @staticmethod
+    def normalizar(size): return (max(1, int(size[0])), max(1, int(size[1])))
+
+    def original(self, path):
+        img = self.originales.get(path)
+        if img is None:
+            img = Image.open(path); img.load()
+            self.originales[path] = img
+        return img
+
+    def faltante(self, path, error):
+        if path not in self.faltantes: print(f"Advertencia: no se pudo leer la imagen {path}: {error}")
+        self.faltantes.add(path)
+
+    def medida(self, path):
+        """Tamaño del original sin decodificarlo (del preset o de la cabecera del archivo). None si no se puede leer."""
+        img = self.originales.get(path)
+        if img is not None: return img.size
+        if path in self.medidas: return self.medidas[path]
+        if path in self.faltantes: return None
+        try:
+            with Image.open(path) as im: self.medidas[path] = im.size
+        except OSError as e: self.faltante(path, e); return None
+        return self.medidas[path]
+
+    def cercana(self, path, size, scale):
+        """Variante ya hecha de 'path' más parecida a 'size' (misma escala primero), o None si no hay ninguna."""
+        area = size[0] * size[1]
+        candidatas = [(c[2] != scale, abs(c[1][0] * c[1][1] - area), img) for c, (img, _) in self.variantes.items() if c[0] == path]
+        return min(candidatas, key=lambda t: t[:2])[2] if candidatas else None
+
+    def instalar(self, path, size, scale, img, tam_original):
+        """Agrega una variante ya redimensionada (de un preset) como definitiva."""
+        self.medidas[path] = tuple(tam_original)
+        self.guardar((path, self.normalizar(size), scale), self.convertir(img), True)
+
+    def guardar(self, clave, img, final):
+        self.variantes[clave] = (img, final)
+        self.variantes.move_to_end(clave)
+        while len(self.variantes) > self.max_items: self.variantes.popitem(last=False)
+
+    def obtener(self, path, size, scale=1.0, rapido=False):
+        """Devuelve la imagen convertida para 'size'. Un acierto no cuesta ningún redimensionado.
+
+        Si el archivo no se puede leer devuelve None (el motor oculta el ítem en vez de abortar el redibujo).
+        """
+        clave = (path, self.normalizar(size), scale)
+        ent = self.variantes.get(clave)
+        if ent is not None and (ent[1] or rapido):
+            self.variantes.move_to_end(clave)
+            return ent[0]
+        if path in self.faltantes: return self.cercana(path, clave[1], scale) # Lo horneado en un preset sigue sirviendo
+        try:
+            if self.pool is not None and (not rapido or path not in self.originales):
+                # La versión definitiva (y la decodificación, si falta) se calcula en el pool; mientras tanto se muestra una vista previa
+                self.pedir_final(clave)
+                if ent is not None: return ent[0]
+                if path not in self.originales: return self.cercana(path, clave[1], scale) # Nada de leer archivos en el hilo de Tk
+                rapido = True
+            if rapido: img = self.original(path).resize(clave[1], Image.Resampling.BILINEAR, reducing_gap=2.0)
+            else: img = self.original(path).resize(clave[1], Image.Resampling.LANCZOS)
+        except OSError as e: self.faltante(path, e); return None
+        img = self.convertir(img)
+        self.guardar(clave, img, not rapido)
+        return img
+
+    def pedir_final(self, clave):
+        if clave in self.pendientes: return
+        self.pendientes.add(clave)
+        path, orig, gen = clave[0], self.originales.get(clave[0]), self.generacion
+        def trabajo(orig=orig):
+            if orig is None: orig = Image.open(path); orig.load()
+            return orig, orig.resize(clave[1], Image.Resampling.LANCZOS)
+        fut = self.pool.submit(trabajo)
+        fut.add_done_callback(lambda f: self.en_hilo_ui(self._instalar_final, clave, f, gen))
+
+    def _instalar_final(self, clave, fut, gen):
+        self.pendientes.discard(clave)
+        error = fut.exception()
+        if gen == self.generacion:
+            if error is not None: self.faltante(clave[0], error) # El próximo redibujo oculta el ítem o deja lo horneado
+            elif error is None:
+                orig, img = fut.result()
+                self.originales.setdefault(clave[0], orig)
+                self.guardar(clave, self.convertir(img), True)
+        if self.al_listo: self.al_listo() # También si se descartó: el redibujo vuelve a pedir lo que haga falta
+
+    def precargar(self, path, tamanos, listo):
+        """Decodifica 'path' y genera sus variantes LANCZOS fuera del hilo de Tk.
+
+        'tamanos(original)' devuelve una lista de (tamaño, escala); 'listo(error)' se llama en el
+        hilo de Tk cuando todo está instalado en la caché (error es None si salió bien).
+        """
+        def trabajo():
+            orig = Image.open(path); orig.load()
+            return orig, [(self.normalizar(sz), sc, orig.resize(self.normalizar(sz), Image.Resampling.LANCZOS)) for sz, sc in tamanos(orig)]
+        def instalar(res, err):
+            if err is not None: listo(err); return
+            orig, variantes = res
+            self.originales[path] = orig
+            for sz, sc, img in variantes: self.guardar((path, sz, sc), self.convertir(img), True)
+            listo(None)
+        if self.pool is None:
+            try: res = trabajo()
+            except Exception as e: instalar(None, e)
+            else: instalar(res, None)
+            return
+        fut = self.pool.submit(trabajo)
+        fut.add_done_callback(lambda f: self.en_hilo_ui(instalar, None if f.exception() else f.result(), f.exception()))
+
+    def olvidar(self, path):
+        """Descarta el original y todas las variantes de una ruta (ej. al volver a cargarla)."""
+        self.originales.pop(path, None); self.medidas.pop(path, None); self.faltantes.discard(path); self.generacion += 1
+        for clave in [c for c in self.variantes if c[0] == path]: del self.variantes[clave]
+
+# --- CACHÉ DE RÓTULOS (TEXTO CON BORDE PRE-RENDERIZADO) ---
+DIRS_FUENTES = [os.path.join(os.environ.get("WINDIR", "C:\\Windows"), "Fonts"),
+                os.path.join(os.environ.get("LOCALAPPDATA", ""), "Microsoft", "Windows", "Fonts"),
+                "/usr/share/fonts", "/usr/local/share/fonts", os.path.expanduser("~/.fonts"),
+                os.path.expanduser("~/.local/share/fonts"), "/Library/Fonts", "/System/Library/Fonts",
+                os.path.expanduser("~/Library/Fonts")]
+
+class IndiceFuentesDisco:
+    """Guarda entre sesiones la lista de familias de Tk y el índice de archivos de fuentes.
+
+    La firma son las fechas de modificación de las carpetas de fuentes y de sus subcarpetas
+    directas: instalar o borrar una fuente la cambia y todo se vuelve a enumerar.
+    """
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.datos = None # Se lee (y se calcula la firma) en el primer uso, no al arrancar
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def firma():
+        f = []
+        for base in DIRS_FUENTES:
+            if not os.path.isdir(base): continue
+            try:
+                f.append([base, os.stat(base).st_mtime_ns])
+                with os.scandir(base) as it: f += sorted([e.path, e.stat().st_mtime_ns] for e in it if e.is_dir())
+            except OSError: continue
+        return f
+
+    def _cargar(self):
+        if self.datos is not None: return
+        firma = self.firma()
+        try:
+            with open(self.ruta, encoding="utf-8") as fh: datos = json.load(fh)
+        except (OSError, ValueError): datos = {}
+        self.datos = datos if datos.get('firma') == firma else {'firma': firma}
+
+    def obtener(self, clave):
+        with self.lock:
+            self._cargar(); return self.datos.get(clave)
+
+    def guardar(self, clave, valor):
+        with self.lock:
+            self._cargar(); self.datos[clave] = valor
+            try:
+                os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+                tmp = self.ruta + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as fh: json.dump(self.datos, fh, ensure_ascii=False)
+                os.replace(tmp, self.ruta)
+            except OSError as e: print(f"Advertencia: no se pudo guardar el índice de fuentes: {e}")
+
+class CacheRotulos:
+    """Renderiza una sola vez cada nombre con borde (Pillow stroke_width) como bitmap RGBA.
+
+    Sustituye las 9 copias de texto en el Canvas por un único ítem de imagen. La caché es LRU e
+    indexada por (texto, familia, tamaño, color, borde, ancho de ajuste). Si la familia no se
+    encuentra como archivo TrueType, obtener() devuelve None y se usa el outline clásico de Tk.
+    """
+    def __init__(self, max_items=64, convertir=None, px_por_punto=96 / 72):
+        self.max_items = max_items
+        self.convertir = convertir or ImageTk.PhotoImage
+        self.px_por_punto = px_por_punto # 'tk scaling': los tamaños de fuente de Tk están en puntos
+        self.indice = {}                 # familia en minúsculas -> {estilo: ruta}
+        self.fuentes = {}                # (familia, tamaño px) -> ImageFont o None
+        self.rotulos = OrderedDict()
+
+    def indexar(self, disco=None):
+        """Recorre las carpetas de fuentes del sistema (pensado para correr en el pool).
+
+        Con 'disco' (IndiceFuentesDisco) se reutiliza el índice de la sesión anterior si sigue vigente.
+        """
+        if disco is not None:
+            guardado = disco.obtener('indice')
+            if guardado is not None: self.indice = guardado; self.fuentes = {}; return
+        indice = {}
+        for base in DIRS_FUENTES:
+            if not os.path.isdir(base): continue
+            for raiz, _, archivos in os.walk(base):
+                for a in archivos:
+                    if not a.lower().endswith((".ttf", ".otf", ".ttc")): continue
+                    ruta = os.path.join(raiz, a)
+                    try: fam, estilo = ImageFont.truetype(ruta, 10).getname()
+                    except Exception: continue
+                    indice.setdefault((fam or "").lower(), {}).setdefault((estilo or "").lower(), ruta)
+        self.indice = indice; self.fuentes = {}
+        if disco is not None: disco.guardar('indice', indice)
+
+    def fuente(self, familia, px):
+        clave = (familia, px)
+        if clave in self.fuentes: return self.fuentes[clave]
+        estilos = self.indice.get(familia.lower(), {})
+        candidatos = [estilos[e] for e in ("bold", "negrita", "regular", "normal") if e in estilos] + list(estilos.values())
+        candidatos += [familia + ".ttf", familia.replace(" ", "").lower() + ".ttf"]
+        f = None
+        for c in candidatos:
+            try: f = ImageFont.truetype(c, px); break
+            except Exception: continue
+        self.fuentes[clave] = f
+        return f
+
+    @staticmethod
+    def envolver(texto, fuente, ancho):
+        """Ajuste de línea por palabras equivalente al 'width' de un texto de Canvas."""
+        lineas = []
+        for parrafo in texto.split("\n"):
+            actual = ""
+            for palabra in parrafo.split(" "):
+                prueba = palabra if not actual else actual + " " + palabra
+                if actual and fuente.getlength(prueba) > ancho: lineas.append(actual); actual = palabra
+                else: actual = prueba
+            lineas.append(actual)
+        return "\n".join(lineas)
+
+    def obtener(self, texto, familia, puntos, fill, outline, max_width):
+        clave = (texto, familia, puntos, fill, outline, int(max_width))
+        img = self.rotulos.get(clave)
+        if img is not None:
+            self.rotulos.move_to_end(clave); return img
+        f = self.fuente(familia, max(1, round(puntos * self.px_por_punto)))
+        if f is None: return None
+        borde = 2 if outline else 0
+        txt = self.envolver(texto, f, max_width)
+        caja = ImageDraw.Draw(Image.new("RGBA", (1, 1))).multiline_textbbox((0, 0), txt, font=f, align="center", stroke_width=borde)
+        caja = (math.floor(caja[0]), math.floor(caja[1]), math.ceil(caja[2]), math.ceil(caja[3]))
+        lienzo = Image.new("RGBA", (max(1, caja[2] - caja[0]), max(1, caja[3] - caja[1])), (0, 0, 0, 0))
+        if txt.strip():
+            ImageDraw.Draw(lienzo).multiline_text((-caja[0], -caja[1]), txt, font=f, fill=fill, align="center", stroke_width=borde, stroke_fill="black")
+        img = self.convertir(lienzo)
+        self.rotulos[clave] = img
+        while len(self.rotulos) > self.max_items: self.rotulos.popitem(last=False)
+        return img
+
+def tam_logo(orig_size, h, logo_scale):
+    """Tamaño en pantalla del logo: 20% de la altura del tablero por la escala, respetando el aspecto."""
+    base_logo_size = h * 0.2 * logo_scale
+    aspect = orig_size[0] / orig_size[1]
+    return (int(base_logo_size * aspect), int(base_logo_size))
+
+# --- MODELO DEL MATCH (OBSERVABLE) ---
+class Equipo:
+    """Datos de un equipo. Asignar un campo publica el cambio en su Match (solo si el valor cambió)."""
+    __slots__ = ('nombre', 'puntos', 'faltas', 'idx', '_match')
+    CAMPOS = ('nombre', 'puntos', 'faltas')
+
+    def __init__(self, nombre, puntos=0, faltas=0, idx=0, match=None):
+        for campo, valor in (('nombre', nombre), ('puntos', puntos), ('faltas', faltas), ('idx', idx), ('_match', match)):
+            object.__setattr__(self, campo, valor)
+
+    def __setattr__(self, campo, valor):
+        anterior = getattr(self, campo, None)
+        if campo in Equipo.CAMPOS and anterior == valor: return
+        object.__setattr__(self, campo, valor)
+        if campo in Equipo.CAMPOS and self._match is not None: self._match.publicar(self.idx, campo, valor, anterior)
+
+    def a_dict(self): return {c: getattr(self, c) for c in Equipo.CAMPOS}
+
+    def __repr__(self): return f"Equipo({self.nombre!r}, puntos={self.puntos}, faltas={self.faltas})"
+
+class Match:
+    """Lista de equipos con avisos de cambio por campo.
+
+    Los oyentes reciben (idx, campo, valor, anterior). Un cambio en el número de equipos se publica
+    con idx=None y campo 'equipos' (valor = nuevo número). suscribir(fn, campos) filtra por campo.
+    """
+    __slots__ = ('equipos', '_oyentes')
+    MAX_EQUIPOS = 16
+    NOMBRES_DEFAULT = ["ROJO", "AMARILLO", "AZUL", "VERDE"]
+
+    def __init__(self):
+        self.equipos = []
+        self._oyentes = []
+
+    def suscribir(self, fn, campos=None):
+        self._oyentes.append((fn, frozenset(campos) if campos else None))
+        return fn
+
+    def desuscribir(self, fn): self._oyentes = [(f, c) for f, c in self._oyentes if f != fn]
+
+    def publicar(self, idx, campo, valor, anterior):
+        for fn, campos in self._oyentes:
+            if campos is None or campo in campos: fn(idx, campo, valor, anterior)
+
+    def ajustar(self, n):
+        """Ajusta el número de equipos conservando los existentes."""
+        actual = len(self.equipos)
+        if n == actual: return
+        for i in range(actual, n):
+            nom = self.NOMBRES_DEFAULT[i] if i < len(self.NOMBRES_DEFAULT) else f"EQ {i+1}"
+            self.equipos.append(Equipo(nom, idx=i, match=self))
+        del self.equipos[n:]
+        self.publicar(None, 'equipos', n, actual)
+
+    def cargar(self, datos):
+        """Carga una lista de dicts {'nombre','puntos','faltas'}; solo se publican los campos que cambian."""
+        self.ajustar(len(datos))
+        for eq, d in zip(self.equipos, datos):
+            for campo in Equipo.CAMPOS:
+                if campo in d: setattr(eq, campo, d[campo])
+
+    def __len__(self): return len(self.equipos)
+    def __iter__(self): return iter(self.equipos)
+    def __getitem__(self, i): return self.equipos[i]
+
+class Torneo:
+    """Torneo por rondas: resultados de cada ronda cerrada y una tabla acumulada en vivo.
+
+    La tabla escucha al Match: cada cambio suma (valor - anterior) a la fila del equipo y solo esa
+    fila se reubica en la clasificación, sin reordenar todo tras cada punto. Los equipos se
+    identifican por su posición (idx). Desempates: más puntos, menos faltas, más rondas ganadas.
+    """
+    def __init__(self, match):
+        self.match = match
+        self.activo = False
+        self.rondas = []  # Una lista de {'nombre','puntos','faltas'} por ronda cerrada
+        self.filas = {}   # idx -> {'puntos','faltas','ganadas'} acumulados (rondas cerradas + ronda en juego)
+        self.orden = []   # Índices de equipo de primero a último
+        self._cerrando = False
+        match.suscribir(self.al_cambiar)
+
+    def clave(self, i):
+        f = self.filas[i]
+        return (-f['puntos'], f['faltas'], -f['ganadas'], i)
+
+    def posicion(self, i): return self.orden.index(i) + 1
+
+    def _reubicar(self, i):
+        """Mueve la fila i hacia arriba o abajo hasta su lugar (el resto ya está ordenado)."""
+        o = self.orden; p = o.index(i); k = self.clave(i)
+        while p > 0 and self.clave(o[p-1]) > k: o[p], o[p-1] = o[p-1], o[p]; p -= 1
+        while p < len(o) - 1 and self.clave(o[p+1]) < k: o[p], o[p+1] = o[p+1], o[p]; p += 1
+
+    def _fila_nueva(self, i):
+        """Fila de un equipo a partir de las rondas cerradas y de su marcador actual."""
+        f = {'puntos': 0, 'faltas': 0, 'ganadas': 0}
+        for ronda in self.rondas:
+            if i < len(ronda):
+                f['puntos'] += ronda[i]['puntos']; f['faltas'] += ronda[i]['faltas']
+                if self._gano(ronda, i): f['ganadas'] += 1
+        if i < len(self.match.equipos): f['puntos'] += self.match.equipos[i].puntos; f['faltas'] += self.match.equipos[i].faltas
+        return f
+
+    @staticmethod
+    def _gano(ronda, i):
+        mejor = max(r['puntos'] for r in ronda)
+        return mejor > 0 and ronda[i]['puntos'] == mejor
+
+    def recalcular(self):
+        """Reconstrucción completa (solo al empezar o cargar un torneo)."""
+        n = len(self.match.equipos)
+        self.filas = {i: self._fila_nueva(i) for i in range(n)}
+        self.orden = sorted(range(n), key=self.clave)
+
+    def al_cambiar(self, idx, campo, valor, anterior):
+        if self._cerrando: return # Reinicio de marcadores al cerrar ronda: la tabla ya los incluye
+        if campo == 'equipos':
+            for i in range(valor, anterior): self.filas.pop(i, None); self.orden.remove(i)
+            for i in range(anterior, valor):
+                self.filas[i] = self._fila_nueva(i); self.orden.append(i); self._reubicar(i)
+        elif campo in ('puntos', 'faltas'):
+            self.filas[idx][campo] += valor - anterior; self._reubicar(idx)
+
+    def iniciar(self):
+        self.activo = True; self.rondas = []; self.recalcular()
+
+    def cerrar_ronda(self):
+        """Guarda el resultado de la ronda en juego y deja los marcadores en cero para la siguiente."""
+        ronda = [eq.a_dict() for eq in self.match.equipos]
+        self.rondas.append(ronda)
+        for i in range(len(ronda)):
+            if self._gano(ronda, i): self.filas[i]['ganadas'] += 1; self._reubicar(i)
+        self._cerrando = True
+        try:
+            for eq in self.match.equipos: eq.puntos = 0; eq.faltas = 0
+        finally: self._cerrando = False
+
+    def a_dict(self): return {'activo': self.activo, 'rondas': self.rondas}
+
+    def cargar(self, datos):
+        self.activo = datos.get('activo', False); self.rondas = datos.get('rondas', []); self.recalcular()
+
+# --- MODELO DEL TABLERO (independiente de Tk) ---
+class EstadoTablero:
+    """Todo lo que el tablero necesita para dibujarse: equipos, reloj y variables de diseño.
+
+    No depende de Tk, así que el motor de render puede usarse sin pantalla (benchmarks, tests).
+    Los interruptores pueden ser bool o variables de Tk (ver activo()).
+    """
+    def __init__(self, n_equipos=3):
         # --- VARIABLES DE ESTADO (MODELO DE DATOS) ---
-        self.equipos = [] # Lista de diccionarios con datos de cada equipo
-        self.num_equipos_var = tk.IntVar(value=3) # Por defecto 3 equipos
+        self.match = Match() # Equipos observables (ver Match.suscribir)
+        self.torneo = Torneo(self.match) # Tabla acumulada por rondas (modo torneo)
         self.fondo_path = None
         self.logo_path = None
-        
-        self.tiempo_restante = 240 # 4 minutos en segundos
+        self.tiempo_restante = 240 # 4 minutos en segundos (float: conserva la fracción al pausar)
         self.corriendo = False # Estado del reloj
-        
-        # Slots para 6 efectos de sonido
-        self.sonidos = [{'name': f'FX {i+1}', 'path': None, 'obj': None} for i in range(6)]
+        self.sonidos = BibliotecaSonidos.banco_vacio("Banco 1")['clips'] # Slots de la página activa
+        self.disparos = Counter() # Sin audio (simulador): solo se cuentan los disparos por slot
+        self.presets = None       # BibliotecaPresets, si la hay
         
         # --- VARIABLES DE DISEÑO (VIEW MODEL) ---
         # Controlan posiciones, tamaños y colores de la proyección
@@ -75,11 +854,1059 @@ class ImproMatchApp:
         self.timer_position = "Abajo" # Ubicación del reloj
         
         # Interruptores de Visibilidad
-        self.ver_timer = tk.BooleanVar(value=True)
-        self.ver_faltas = tk.BooleanVar(value=True)
-        self.var_outline = tk.BooleanVar(value=True) # Borde negro en texto
+        self.ver_timer = True
+        self.ver_faltas = True
+        self.var_outline = True       # Borde negro en texto
+        self.var_decimas = False      # Mostrar décimas en los últimos 10 segundos
+        self.modo_rapido = False      # True mientras el operador arrastra (remuestreo barato)
+        self.ajustar_equipos(n_equipos)
+
+    @property
+    def equipos(self): return self.match.equipos
+
+    def ajustar_equipos(self, n):
+        """Ajusta la lista de equipos al número pedido conservando los existentes."""
+        self.match.ajustar(n)
+
+    # --- ACCIONES (las comparten el panel, el control remoto y el simulador) ---
+    # ImproMatchApp redefine las que tocan el reloj real, el audio o las imágenes.
+    def mod(self, idx, d, type):
+        """Suma/resta puntos o faltas. Tablero, panel y diario se enteran por los oyentes del Match."""
+        eq = self.equipos[idx]
+        if type == 'p':
+            if eq.puntos + d >= 0: eq.puntos += d
+        else:
+            if 0 <= eq.faltas + d <= 3: eq.faltas += d
+
+    def restante(self): return self.tiempo_restante
+    def iniciar_tiempo(self): self.corriendo = self.tiempo_restante > 0
+    def pausar_tiempo(self): self.corriendo = False
+    def poner_tiempo(self, segundos): self.tiempo_restante = int(segundos)
+    def play_sound(self, idx): self.disparos[idx] += 1
+
+    def aplicar_preset(self, nombre):
+        """Sin pantalla solo se aplica el diseño (las imágenes horneadas son para las cachés de las salidas)."""
+        if self.presets is None: raise ValueError("no hay biblioteca de presets")
+        self.aplicar_diseno_preset(self.presets.leer(nombre)[0])
+
+    def aplicar_diseno_preset(self, cab):
+        for a, v in cab['diseno'].items():
+            if a in ATRIBUTOS_DISENO: asignar(self, a, v)
+        self.fondo_path = cab.get('fondo_path'); self.logo_path = cab.get('logo_path')
+
+    def ejecutar_comando(self, c):
+        """Traduce un comando remoto a las mismas acciones que los botones del panel."""
+        cmd = c.get('cmd')
+        if cmd in ('punto', 'falta', 'nombre'):
+            i = int(c['equipo'])
+            if not 0 <= i < len(self.equipos): raise IndexError(f"no existe el equipo {i}")
+            if cmd == 'nombre': self.equipos[i].nombre = str(c['v'])
+            else: self.mod(i, int(c.get('d', 1)), 'p' if cmd == 'punto' else 'f')
+        elif cmd == 'iniciar': self.iniciar_tiempo()
+        elif cmd == 'pausar': self.pausar_tiempo()
+        elif cmd == 'tiempo': self.poner_tiempo(int(c['s']))
+        elif cmd == 'sonido':
+            k = int(c['slot'])
+            if not 0 <= k < len(self.sonidos): raise IndexError(f"no existe el slot {k}")
+            self.play_sound(k)
+        elif cmd == 'preset': self.aplicar_preset(str(c['nombre']))
+        elif cmd == 'estado':
+            return {'equipos': [eq.a_dict() for eq in self.equipos], 'restante': round(self.restante(), 2), 'corriendo': self.corriendo}
+        elif cmd != 'ping': raise ValueError(f"comando desconocido: {cmd}")
+
+def activo(v): return v.get() if hasattr(v, 'get') else bool(v)
+
+# Variables de diseño que se guardan/restauran (diario, instantáneas)
+ATRIBUTOS_DISENO = ['scale_factor', 'name_scale', 'offset_global_y', 'offset_names', 'offset_scores', 'offset_timer', 'offset_x',
+                    'logo_scale', 'logo_offset_y', 'font_family', 'font_score', 'color_nombres', 'color_puntos', 'color_faltas',
+                    'color_caja', 'box_padding', 'corner_radius', 'timer_position', 'ver_timer', 'ver_faltas', 'var_outline', 'var_decimas']
+
+def asignar(modelo, attr, valor):
+    """Asigna un atributo del modelo respetando las variables de Tk (BooleanVar, etc.)."""
+    actual = getattr(modelo, attr, None)
+    if hasattr(actual, 'set'): actual.set(valor)
+    else: setattr(modelo, attr, valor)
+
+# --- DIARIO DEL MATCH (RECUPERACIÓN TRAS CIERRE INESPERADO) ---
+class DiarioMatch:
+    """Diario de solo-anexado con instantáneas periódicas para recuperar el match tras un cierre.
+
+    registrar() solo encola un registro compacto (nunca bloquea el hilo de Tk). Un hilo escritor
+    los agrupa en lotes y hace fsync fuera del hilo de Tk. Cada CADA_SNAPSHOT registros se escribe
+    una instantánea completa y el diario vuelve a empezar, así la recuperación lee como máximo una
+    instantánea y unos cientos de líneas sin importar la duración del show.
+    """
+    CADA_SNAPSHOT = 500
+
+    def __init__(self, carpeta, intervalo_lote=0.2):
+        self.carpeta = carpeta
+        self.ruta_diario = os.path.join(carpeta, "diario.jsonl")
+        self.ruta_snapshot = os.path.join(carpeta, "snapshot.json")
+        self.intervalo_lote = intervalo_lote # Segundos que el escritor espera para agrupar registros
+        self.cola = queue.Queue()
+        self.seq = 0; self.desde_snapshot = 0
+        self.hilo = None
+
+    # Estado <-> dict
+    @staticmethod
+    def capturar(modelo):
+        return {'equipos': [eq.a_dict() for eq in modelo.equipos], 'tiempo_restante': modelo.tiempo_restante,
+                'fondo_path': modelo.fondo_path, 'logo_path': modelo.logo_path, 'torneo': modelo.torneo.a_dict(),
+                'diseno': {a: (activo(getattr(modelo, a)) if hasattr(getattr(modelo, a), 'get') else getattr(modelo, a)) for a in ATRIBUTOS_DISENO}}
+
+    @staticmethod
+    def ruta_existente(path):
+        """Una imagen del match anterior que ya no está (ej. en un pendrive retirado) se descarta con un aviso."""
+        if path and not os.path.isfile(path):
+            print(f"Advertencia: no se encontró {path}; se recupera el match sin esa imagen."); return None
+        return path
+
+    @staticmethod
+    def restaurar(modelo, estado):
+        modelo.match.cargar(estado['equipos'])
+        if 'torneo' in estado: modelo.torneo.cargar(estado['torneo'])
+        modelo.tiempo_restante = estado['tiempo_restante']
+        modelo.fondo_path = DiarioMatch.ruta_existente(estado.get('fondo_path'))
+        modelo.logo_path = DiarioMatch.ruta_existente(estado.get('logo_path'))
+        for a, v in estado.get('diseno', {}).items():
+            if a in ATRIBUTOS_DISENO: asignar(modelo, a, v)
+
+    @staticmethod
+    def aplicar(modelo, r):
+        """Reaplica un registro. Todos guardan valores absolutos, así que reaplicarlos es idempotente."""
+        op = r['op']
+        if op == 'equipo':
+            if r['i'] < len(modelo.equipos) and r['campo'] in Equipo.CAMPOS: setattr(modelo.equipos[r['i']], r['campo'], r['v'])
+        elif op == 'equipos': modelo.ajustar_equipos(r['n'])
+        elif op == 'reloj': modelo.tiempo_restante = r['restante']
+        elif op == 'diseno' and r['attr'] in ATRIBUTOS_DISENO: asignar(modelo, r['attr'], r['v'])
+        elif op == 'imagen': setattr(modelo, f"{r['destino']}_path", DiarioMatch.ruta_existente(r['path']))
+        elif op == 'torneo':
+            if r['activo'] and r.get('nuevo', True): modelo.torneo.iniciar()
+            else: modelo.torneo.activo = r['activo']
+        elif op == 'ronda': modelo.torneo.cerrar_ronda()
+
+    # Lectura (al arrancar)
+    def recuperar(self, modelo):
+        """Restaura en 'modelo' la instantánea y los registros posteriores. Devuelve True si había datos."""
+        hubo = False; seq_snap = 0
+        try:
+            with open(self.ruta_snapshot, encoding="utf-8") as f: snap = json.load(f)
+            self.restaurar(modelo, snap['estado']); seq_snap = snap['s']; self.seq = seq_snap; hubo = True
+        except (OSError, ValueError, KeyError): pass
+        try:
+            with open(self.ruta_diario, encoding="utf-8") as f:
+                for linea in f:
+                    try: r = json.loads(linea)
+                    except ValueError: continue # Última línea a medio escribir tras un corte
+                    if r.get('s', 0) <= seq_snap: continue # Ya incluido en la instantánea
+                    self.aplicar(modelo, r); self.seq = max(self.seq, r['s']); hubo = True
+        except OSError: pass
+        return hubo
+
+    # Escritura
+    def iniciar(self):
+        os.makedirs(self.carpeta, exist_ok=True)
+        self.hilo = threading.Thread(target=self._escritor, name="match-diario", daemon=True)
+        self.hilo.start()
+
+    def registrar(self, op, **datos):
+        self.seq += 1; self.desde_snapshot += 1
+        self.cola.put(('reg', dict(s=self.seq, op=op, **datos)))
+
+    def necesita_snapshot(self): return self.desde_snapshot >= self.CADA_SNAPSHOT
+
+    def snapshot(self, estado):
+        self.desde_snapshot = 0
+        self.cola.put(('snap', {'s': self.seq, 't': time.time(), 'estado': estado}))
+
+    def cerrar(self, timeout=2.0):
+        self.cola.put(('fin', None))
+        if self.hilo: self.hilo.join(timeout)
+
+    def _escritor(self):
+        f = open(self.ruta_diario, "a", encoding="utf-8")
+        fin = False
+        while not fin:
+            lote = [self.cola.get()]
+            time.sleep(self.intervalo_lote) # Deja que se acumulen los registros de una ráfaga
+            while True:
+                try: lote.append(self.cola.get_nowait())
+                except queue.Empty: break
+            try:
+                for tipo, dato in lote:
+                    if tipo == 'reg': f.write(json.dumps(dato, separators=(",", ":"), ensure_ascii=False) + "\n")
+                    elif tipo == 'snap':
+                        f.flush(); os.fsync(f.fileno())
+                        tmp = self.ruta_snapshot + ".tmp"
+                        with open(tmp, "w", encoding="utf-8") as fs:
+                            json.dump(dato, fs, separators=(",", ":"), ensure_ascii=False); fs.flush(); os.fsync(fs.fileno())
+                        os.replace(tmp, self.ruta_snapshot)
+                        f.close(); f = open(self.ruta_diario, "w", encoding="utf-8") # Diario nuevo tras la instantánea
+                    else: fin = True
+                f.flush(); os.fsync(f.fileno())
+            except OSError as e: print(f"Advertencia: no se pudo escribir el diario del match: {e}")
+        f.close()
+
+# --- PRESETS DE SHOW ---
+class BibliotecaPresets:
+    """Presets con nombre: todo el diseño, imágenes y banco de sonidos, un archivo .mpreset cada uno.
+
+    Formato: MAGIA, largo de la cabecera (uint32), cabecera JSON compacta y, alineados a 16 bytes,
+    los píxeles RGBA crudos de cada imagen ya redimensionada para las salidas. Al leer, el archivo se
+    mapea en memoria y cada imagen se arma con Image.frombuffer sobre el mapa: no se decodifica
+    ni se redimensiona nada, solo se copian los píxeles (en el pool) para poder cerrar el mapa
+    (en Windows un archivo mapeado no se puede reemplazar ni borrar).
+    """
+    MAGIA = b"MIPRESET1\n"
+    EXT = ".mpreset"
+
+    def __init__(self, carpeta):
+        self.carpeta = carpeta
+
+    @staticmethod
+    def limpiar(nombre): return "".join(c for c in nombre if c.isalnum() or c in " -_").strip()
+
+    def ruta(self, nombre): return os.path.join(self.carpeta, self.limpiar(nombre) + self.EXT)
+
+    def nombres(self):
+        try: return sorted(f[:-len(self.EXT)] for f in os.listdir(self.carpeta) if f.endswith(self.EXT))
+        except OSError: return []
+
+    def borrar(self, nombre):
+        """Lanza OSError si el archivo no se puede borrar (ej. abierto por otro programa)."""
+        try: os.remove(self.ruta(nombre))
+        except FileNotFoundError: pass
+
+    @staticmethod
+    def capturar(modelo, banco=None):
+        """Lo que guarda un preset (en el hilo de Tk). Las imágenes se hornean aparte, en guardar()."""
+        return {'diseno': {a: (activo(getattr(modelo, a)) if hasattr(getattr(modelo, a), 'get') else getattr(modelo, a)) for a in ATRIBUTOS_DISENO},
+                'fondo_path': modelo.fondo_path, 'logo_path': modelo.logo_path, 'banco': banco}
+
+    def guardar(self, nombre, datos, trabajos):
+        """Hornea y escribe el preset (pensado para el pool).
+
+        'trabajos' es una lista de (ruta, tamanos); 'tamanos(original)' devuelve [(tamaño, escala)]
+        como en CacheImagenes.precargar. Escritura atómica (temporal + os.replace).
+        """
+        imagenes, bloques, offset = [], [], 0
+        for path, tamanos in trabajos:
+            orig = Image.open(path); orig.load()
+            for tam, escala in tamanos(orig):
+                tam = CacheImagenes.normalizar(tam)
+                px = orig.resize(tam, Image.Resampling.LANCZOS).convert("RGBA").tobytes()
+                imagenes.append({'path': path, 'tam': tam, 'escala': escala, 'original': orig.size, 'offset': offset, 'largo': len(px)})
+                bloques.append(px); offset += len(px)
+        cab = json.dumps(dict(datos, nombre=nombre, imagenes=imagenes), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        relleno = -(len(self.MAGIA) + 4 + len(cab)) % 16
+        os.makedirs(self.carpeta, exist_ok=True)
+        ruta = self.ruta(nombre); tmp = ruta + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(self.MAGIA); f.write(struct.pack("<I", len(cab))); f.write(cab); f.write(b"\0" * relleno)
+            for px in bloques: f.write(px)
+        os.replace(tmp, ruta)
+        return ruta
+
+    def leer(self, nombre):
+        """Devuelve (cabecera, [(ruta, tamaño, escala, tamaño original, imagen RGBA)]).
+
+        Las imágenes son copias: al volver, el archivo ya no está mapeado ni abierto.
+        """
+        with open(self.ruta(nombre), "rb") as f: mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if mapa[:len(self.MAGIA)] != self.MAGIA: raise ValueError(f"{nombre}: no es un preset")
+            largo, = struct.unpack_from("<I", mapa, len(self.MAGIA))
+            inicio = len(self.MAGIA) + 4 + largo
+            cab = json.loads(mapa[len(self.MAGIA) + 4:inicio].decode("utf-8"))
+            inicio += -inicio % 16
+            if hasattr(mmap, 'MADV_WILLNEED'): mapa.madvise(mmap.MADV_WILLNEED) # Lectura anticipada, aún en el pool
+            imagenes = []
+            with memoryview(mapa) as vista:
+                for i in cab['imagenes']:
+                    with vista[inicio + i['offset']:inicio + i['offset'] + i['largo']] as datos:
+                        img = Image.frombuffer("RGBA", tuple(i['tam']), datos, "raw", "RGBA", 0, 1).copy() # Sin referencias al mapa
+                    imagenes.append((i['path'], tuple(i['tam']), i['escala'], tuple(i['original']), img))
+        finally: mapa.close()
+        return cab, imagenes
+
+# --- CONTROL REMOTO (UDP LOCAL) ---
+class ServidorControl:
+    """Recibe comandos JSON por UDP en su propio hilo y los deja en una cola acotada.
+
+    El hilo de Tk los consume por lotes con drenar(): una ráfaga de comandos produce un solo
+    redibujo (el planificador de fotogramas agrupa las marcas). Cada comando se responde al
+    remitente con {'id', 'ok', 'ms'}, donde 'ms' va desde la recepción hasta que se aplicó.
+    Si la cola está llena el comando se rechaza en el acto ('cola llena') en vez de acumular retraso.
+    Fuera de loopback cada comando debe traer 'token' (secreto compartido): sin él se rechaza en
+    el hilo de red y nunca llega al tablero. Sin token configurado el servidor no escucha en la red.
+
+    Comandos: ping, estado, punto/falta (equipo, d), nombre (equipo, v), iniciar, pausar,
+    tiempo (s), sonido (slot), preset (nombre).
+    """
+    PUERTO = 5555
+
+    def __init__(self, host="127.0.0.1", puerto=PUERTO, max_cola=256, token=None):
+        self.host = host; self.puerto = puerto; self.token = token
+        self.cola = queue.Queue(maxsize=max_cola)
+        self.sock = None; self.hilo = None; self.activo = False
+        self.latencia = EstadisticasTick(titulo="Remoto", unidad="comandos")
+        self.rechazados = 0
+
+    @staticmethod
+    def es_local(host):
+        try: return host == "localhost" or ipaddress.ip_address(host).is_loopback
+        except ValueError: return False
+
+    @staticmethod
+    def token_guardado(ruta):
+        """Token del control remoto en red: se genera la primera vez y se reutiliza (los pads lo guardan)."""
+        try:
+            with open(ruta, encoding="utf-8") as f: token = f.read().strip()
+            if token: return token
+        except OSError: pass
+        token = secrets.token_urlsafe(12)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with open(ruta, "w", encoding="utf-8") as f: f.write(token)
+        return token
+
+    def iniciar(self):
+        if not self.token and not self.es_local(self.host):
+            print(f"Advertencia: control remoto desactivado: escuchar en {self.host} requiere un token"); return False
+        try:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.sock.bind((self.host, self.puerto)); self.sock.settimeout(0.5)
+        except OSError as e:
+            print(f"Advertencia: control remoto desactivado ({self.host}:{self.puerto}): {e}")
+            self.sock = None; return False
+        self.puerto = self.sock.getsockname()[1] # Con puerto 0 el sistema elige uno libre
+        self.activo = True
+        self.hilo = threading.Thread(target=self._escuchar, name="match-control", daemon=True)
+        self.hilo.start()
+        return True
+
+    def _escuchar(self):
+        while self.activo:
+            try: datos, remitente = self.sock.recvfrom(4096)
+            except socket.timeout: continue
+            except OSError: return # Socket cerrado
+            t = time.perf_counter()
+            try: c = json.loads(datos)
+            except ValueError: c = None
+            if not isinstance(c, dict): self.responder(remitente, {'ok': False, 'error': "JSON inválido"}); continue
+            if self.token and not hmac.compare_digest(str(c.pop('token', '')).encode("utf-8"), self.token.encode("utf-8")):
+                self.rechazados += 1; self.responder(remitente, {'id': c.get('id'), 'ok': False, 'error': "token inválido"}); continue
+            try: self.cola.put_nowait((c, remitente, t))
+            except queue.Full:
+                self.rechazados += 1; self.responder(remitente, {'id': c.get('id'), 'ok': False, 'error': "cola llena"})
+
+    def responder(self, remitente, r):
+        try: self.sock.sendto(json.dumps(r, separators=(",", ":"), ensure_ascii=False).encode("utf-8"), remitente)
+        except OSError: pass
+
+    def drenar(self, ejecutar, lote_max=64):
+        """Aplica hasta 'lote_max' comandos con 'ejecutar(cmd) -> dict extra o None'. Devuelve cuántos."""
+        n = 0
+        while n < lote_max:
+            try: c, remitente, t = self.cola.get_nowait()
+            except queue.Empty: break
+            try: r = {'ok': True, **(ejecutar(c) or {})}
+            except Exception as e: r = {'ok': False, 'error': str(e) or type(e).__name__} # Un comando fallido (ej. pygame.error) no corta el lote
+            ms = (time.perf_counter() - t) * 1000; self.latencia.registrar(ms)
+            r['id'] = c.get('id'); r['ms'] = round(ms, 3)
+            self.responder(remitente, r); n += 1
+        return n
+
+    def cerrar(self):
+        self.activo = False
+        if self.sock: self.sock.close()
+
+class ClienteControl:
+    """Cliente UDP del control remoto: sirve para probar todo el camino sin hardware y como base para un pad."""
+    def __init__(self, host="127.0.0.1", puerto=ServidorControl.PUERTO, timeout=1.0, token=None):
+        self.destino = (host, puerto); self.token = token
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM); self.sock.settimeout(timeout)
+        self.sig_id = 0
+
+    def mandar(self, cmd, **datos):
+        """Envía sin esperar respuesta (para ráfagas). Devuelve el id del comando."""
+        self.sig_id += 1
+        c = {'id': self.sig_id, 'cmd': cmd, **datos}
+        if self.token: c['token'] = self.token
+        self.sock.sendto(json.dumps(c).encode("utf-8"), self.destino)
+        return self.sig_id
+
+    def recibir(self):
+        r = json.loads(self.sock.recv(65536)); r['t'] = time.perf_counter()
+        return r
+
+    def enviar(self, cmd, **datos):
+        """Envía y espera la respuesta; añade 'rtt_ms' (ida y vuelta medido en el cliente)."""
+        t0 = time.perf_counter(); id_cmd = self.mandar(cmd, **datos)
+        while True:
+            r = self.recibir() # socket.timeout (OSError) si el servidor no responde
+            if r.get('id') == id_cmd: break # Descarta respuestas atrasadas de envíos anteriores
+        r['rtt_ms'] = round((r.pop('t') - t0) * 1000, 3)
+        return r
+
+    def cerrar(self): self.sock.close()
+
+# --- SALIDA WEB (TABLERO EN EL NAVEGADOR) ---
+PAGINA_TABLERO = """<!doctype html>
+<html><head><meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1">
+<title>Match de Impro</title>
+<style>
+html,body{margin:0;height:100%;background:#000 center/cover no-repeat;color:#fff;font-family:Arial,sans-serif;overflow:hidden}
+#tablero{display:flex;flex-direction:column;height:100%;justify-content:space-evenly;align-items:center}
+#equipos{display:grid;gap:2vh 2vw;width:96vw;justify-items:center}
+.eq{text-align:center}.nom{font-weight:bold}.pts{border-radius:1.5vh;padding:0 2vw;display:inline-block}
+.flt span{display:inline-block;width:1.6vh;height:1.6vh;border-radius:50%;margin:0 .3vh;background:#333}
+#reloj{border-radius:1.5vh;padding:0 3vw;font-size:14vh}#logo{max-height:20vh}
+</style></head><body><div id="tablero"><img id="logo" hidden><div id="equipos"></div><div id="reloj"></div></div>
+<script>
+let E = null;
+function equipo(i, q){
+  const d = document.getElementById("eq" + i); if(!d) return;
+  d.querySelector(".nom").textContent = q.nombre; d.querySelector(".pts").textContent = q.puntos;
+  d.querySelectorAll(".flt span").forEach((s, k) => s.style.background = k < q.faltas ? E.colores.faltas : "#333");
+}
+function todo(){
+  const n = E.equipos.length, cols = n <= 4 ? n : Math.ceil(n / Math.ceil(n / 4)), esc = n <= 4 ? 1 : 4 / Math.ceil(n / cols) / 2;
+  const g = document.getElementById("equipos"); g.style.gridTemplateColumns = "repeat(" + cols + ",1fr)";
+  g.innerHTML = E.equipos.map((q, i) => '<div class="eq" id="eq' + i + '"><div class="nom" style="font-size:' + 6 * esc + 'vh;color:' + E.colores.nombres + ';font-family:' + E.fuentes[0] +
+    '"></div><div class="pts" style="font-size:' + 16 * esc + 'vh;color:' + E.colores.puntos + ';background:' + E.colores.caja + ';font-family:' + E.fuentes[1] +
+    '"></div><div class="flt"' + (E.ver_faltas ? "" : " hidden") + '><span></span><span></span><span></span></div></div>').join("");
+  E.equipos.forEach((q, i) => equipo(i, q));
+  const r = document.getElementById("reloj"); r.hidden = !E.ver_timer; r.style.background = E.colores.caja; r.style.fontFamily = E.fuentes[1]; r.textContent = E.reloj;
+  r.style.order = E.timer_arriba ? -1 : 1;
+  document.body.style.backgroundImage = E.fondo ? "url(/img/fondo?v=" + encodeURIComponent(E.fondo) + ")" : "none";
+  const l = document.getElementById("logo"); l.hidden = !E.logo; if(E.logo) l.src = "/img/logo?v=" + encodeURIComponent(E.logo);
+}
+const ev = new EventSource("/eventos");
+ev.onmessage = m => {
+  const d = JSON.parse(m.data);
+  if(d.estado){ E = d.estado; todo(); return; }
+  if(!E) return;
+  if(d.e) for(const i in d.e){ E.equipos[i] = d.e[i]; equipo(i, d.e[i]); }
+  if(d.t !== undefined){ E.reloj = d.t; document.getElementById("reloj").textContent = d.t; }
+};
+</script></body></html>
+"""
+
+class ServidorWeb:
+    """Página de tablero para navegadores (TV del lobby, teléfonos) servida desde su propio hilo.
+
+    GET / devuelve la página; GET /estado, el estado completo; GET /eventos es un flujo
+    Server-Sent Events con deltas compactos: {"e": {idx: equipo}}, {"t": reloj}, o {"estado": ...}
+    cuando cambia el diseño. publicar() se llama desde el hilo de Tk y solo encola; cada cliente
+    tiene una cola acotada y, si se atrasa, recibe el estado completo en lugar de los deltas perdidos.
+    """
+    PUERTO = 8080
+    TIPOS = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg"}
+
+    def __init__(self, host="127.0.0.1", puerto=PUERTO):
+        self.host = host; self.puerto = puerto
+        self.httpd = None
+        self.lock = threading.Lock()
+        self.clientes = {}  # cola del cliente -> True si debe recibir el estado completo
+        self.estado = None; self.estado_json = "null"
+        self.rutas = {}     # 'fondo'/'logo' -> ruta local (no se expone a los clientes)
+        self.archivos = {}  # ruta -> bytes (cada imagen se lee del disco una sola vez)
+
+    @property
+    def activo(self): return self.httpd is not None
+
+    def iniciar(self):
+        web = self
+        class Manejador(BaseHTTPRequestHandler):
+            def log_message(self, *args): pass
+            def do_GET(self): web._atender(self)
+        try: self.httpd = ThreadingHTTPServer((self.host, self.puerto), Manejador)
+        except OSError as e:
+            print(f"Advertencia: no se pudo abrir la página web en {self.host}:{self.puerto}: {e}"); return False
+        self.httpd.daemon_threads = True
+        self.puerto = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, name="match-web", daemon=True).start()
+        return True
+
+    def detener(self):
+        httpd, self.httpd = self.httpd, None
+        if httpd: httpd.shutdown(); httpd.server_close()
+
+    def publicar(self, msg, rutas=None):
+        """Aplica el delta al estado guardado y lo reparte a los clientes conectados (hilo de Tk)."""
+        if rutas is not None: self.rutas = rutas
+        if 'estado' in msg: self.estado = msg['estado']
+        elif self.estado is not None:
+            for i, eq in msg.get('e', {}).items():
+                if i < len(self.estado['equipos']): self.estado['equipos'][i] = eq
+            if 't' in msg: self.estado['reloj'] = msg['t']
+        self.estado_json = json.dumps(self.estado, separators=(",", ":"), ensure_ascii=False)
+        datos = json.dumps(msg, separators=(",", ":"), ensure_ascii=False)
+        with self.lock:
+            for cola in self.clientes:
+                try: cola.put_nowait(datos)
+                except queue.Full: self.clientes[cola] = True # Se atrasó: recibirá el estado completo
+
+    def _atender(self, h):
+        ruta = h.path.split("?")[0]
+        if ruta == "/eventos": return self._eventos(h)
+        if ruta == "/": cuerpo, tipo = PAGINA_TABLERO.encode("utf-8"), "text/html; charset=utf-8"
+        elif ruta == "/estado": cuerpo, tipo = self.estado_json.encode("utf-8"), "application/json"
+        elif ruta in ("/img/fondo", "/img/logo") and self.rutas.get(ruta[5:]):
+            archivo = self.rutas[ruta[5:]]
+            try:
+                if archivo not in self.archivos:
+                    with open(archivo, "rb") as f: self.archivos[archivo] = f.read()
+            except OSError: return h.send_error(404)
+            cuerpo, tipo = self.archivos[archivo], self.TIPOS.get(os.path.splitext(archivo)[1].lower(), "application/octet-stream")
+        else: return h.send_error(404)
+        h.send_response(200); h.send_header("Content-Type", tipo); h.send_header("Content-Length", str(len(cuerpo)))
+        h.end_headers(); h.wfile.write(cuerpo)
+
+    def _eventos(self, h):
+        h.send_response(200)
+        h.send_header("Content-Type", "text/event-stream"); h.send_header("Cache-Control", "no-cache")
+        h.end_headers()
+        cola = queue.Queue(maxsize=64)
+        with self.lock: self.clientes[cola] = True # Lo primero que recibe es el estado completo
+        try:
+            while self.httpd is not None:
+                with self.lock: completo = self.clientes[cola]; self.clientes[cola] = False
+                if completo:
+                    while not cola.empty(): cola.get_nowait()
+                    datos = '{"estado":' + self.estado_json + '}'
+                else:
+                    try: datos = cola.get(timeout=15)
+                    except queue.Empty: datos = None
+                h.wfile.write((f"data: {datos}\n\n" if datos else ": ping\n\n").encode("utf-8")); h.wfile.flush()
+        except OSError: pass # El navegador cerró la conexión
+        finally:
+            with self.lock: self.clientes.pop(cola, None)
+
+    def n_clientes(self): return len(self.clientes)
+
+# --- DESTINOS DE RENDER ---
+class DestinoRender(ABC):
+    """Interfaz mínima que el motor usa para dibujar. Los ids de ítem son opacos para el motor.
+
+    Un destino al que le falte algún método falla al construirse, no a mitad de un redibujo.
+    """
+    px_por_punto = 96 / 72 # Píxeles por punto tipográfico ('tk scaling')
+    @abstractmethod
+    def tamano(self): ...
+    @abstractmethod
+    def imagen(self, pil): ...                 # PIL -> imagen del destino
+    @abstractmethod
+    def crear(self, tipo, coords, tags, opts): ... # tipo: polygon/text/oval/image
+    @abstractmethod
+    def mover(self, iid, coords): ...
+    @abstractmethod
+    def configurar(self, iid, opts): ...
+    @abstractmethod
+    def borrar(self, iid): ...
+    @abstractmethod
+    def bajar(self, iid): ...                  # Al fondo de la pila
+    @abstractmethod
+    def subir(self, iid, sobre): ...           # Justo encima de 'sobre'
+
+class DestinoTk(DestinoRender):
+    """Dibuja sobre el tk.Canvas del proyector."""
+    def __init__(self, canvas, ventana):
+        self.canvas = canvas; self.ventana = ventana
+        self.px_por_punto = float(canvas.tk.call('tk', 'scaling'))
+    def tamano(self): return self.ventana.winfo_width(), self.ventana.winfo_height()
+    def imagen(self, pil): return ImageTk.PhotoImage(pil)
+    def crear(self, tipo, coords, tags, opts): return getattr(self.canvas, f"create_{tipo}")(*coords, tags=tags, **opts)
+    def mover(self, iid, coords): self.canvas.coords(iid, *coords)
+    def configurar(self, iid, opts): self.canvas.itemconfig(iid, **opts)
+    def borrar(self, iid): self.canvas.delete(iid)
+    def bajar(self, iid): self.canvas.tag_lower(iid)
+    def subir(self, iid, sobre): self.canvas.tag_raise(iid, sobre)
+
+class DestinoGrabacion(DestinoRender):
+    """Destino sin Tk: guarda los ítems en memoria y cuenta cada operación (para medir el costo)."""
+    def __init__(self, w=1920, h=1080, px_por_punto=96 / 72):
+        self.w = w; self.h = h; self.px_por_punto = px_por_punto
+        self.items = {}  # id -> [tipo, coords, opciones]
+        self.orden = []  # Pila de dibujo, de abajo hacia arriba
+        self.ops = Counter()
+        self._sig = 0
+    def tamano(self): return self.w, self.h
+    def imagen(self, pil): return pil
+    def crear(self, tipo, coords, tags, opts):
+        self._sig += 1; self.ops['crear'] += 1
+        self.items[self._sig] = [tipo, list(coords), dict(opts)]; self.orden.append(self._sig)
+        return self._sig
+    def mover(self, iid, coords): self.items[iid][1] = list(coords); self.ops['mover'] += 1
+    def configurar(self, iid, opts): self.items[iid][2].update(opts); self.ops['configurar'] += 1
+    def borrar(self, iid): del self.items[iid]; self.orden.remove(iid); self.ops['borrar'] += 1
+    def bajar(self, iid): self.orden.remove(iid); self.orden.insert(0, iid); self.ops['orden'] += 1
+    def subir(self, iid, sobre):
+        self.orden.remove(iid); self.orden.insert(self.orden.index(sobre) + 1, iid); self.ops['orden'] += 1
+    def visibles(self): return sum(1 for it in self.items.values() if it[2].get('state') != "hidden")
+    def tomar_ops(self):
+        """Devuelve las operaciones acumuladas desde la última llamada y reinicia el contador."""
+        ops, self.ops = self.ops, Counter()
+        return ops
+
+class DestinoPillow(DestinoGrabacion):
+    """Destino de grabación que además puede rasterizar la escena en una imagen RGBA con Pillow."""
+    def __init__(self, w=1920, h=1080, px_por_punto=96 / 72):
+        DestinoGrabacion.__init__(self, w, h, px_por_punto)
+        self.tipos = None # CacheRotulos usado solo para resolver fuentes y ajustar líneas
+        self.rgba = {}    # id(imagen) -> (imagen, copia RGBA): el fondo JPEG no se convierte en cada fotograma
+        self.copias = {}  # id -> copia inmutable del ítem para escena_visible (se rehace solo si el ítem cambió)
+
+    def fuente(self, font):
+        if self.tipos is None: self.tipos = CacheRotulos(convertir=lambda i: i, px_por_punto=self.px_por_punto); self.tipos.indexar()
+        px = max(1, round(font[1] * self.px_por_punto))
+        f = self.tipos.fuente(font[0], px)
+        if f is None:
+            try: f = ImageFont.load_default(px)
+            except TypeError: f = ImageFont.load_default() # Pillow < 10.1
+        return f
+
+    def mover(self, iid, coords): self.copias.pop(iid, None); DestinoGrabacion.mover(self, iid, coords)
+    def configurar(self, iid, opts): self.copias.pop(iid, None); DestinoGrabacion.configurar(self, iid, opts)
+    def borrar(self, iid): self.copias.pop(iid, None); DestinoGrabacion.borrar(self, iid)
+
+    def escena_visible(self):
+        """Copia de los ítems visibles, en orden de dibujo (para rasterizar desde otro hilo).
+
+        Solo se copian los ítems que cambiaron desde la copia anterior; el resto se comparte (nadie los modifica).
+        """
+        escena = []
+        for iid in self.orden:
+            copia = self.copias.get(iid)
+            if copia is None:
+                t, c, o = self.items[iid]; copia = self.copias[iid] = (t, tuple(c), dict(o))
+            if copia[2].get('state') != "hidden": escena.append(copia)
+        return escena
+
+    def a_rgba(self, img):
+        if img.mode == "RGBA": return img
+        reg = self.rgba.get(id(img))
+        if reg is None or reg[0] is not img:
+            if len(self.rgba) >= 8: self.rgba.clear()
+            reg = self.rgba[id(img)] = (img, img.convert("RGBA"))
+        return reg[1]
+
+    def rasterizar(self, fondo=(0, 0, 0, 255), escena=None, lienzo=None):
+        """Dibuja la escena (o una copia tomada con escena_visible) en una imagen RGBA.
+
+        Con 'lienzo' (RGBA del mismo tamaño) se limpia y reutiliza en vez de crear una imagen nueva.
+        """
+        if lienzo is None: lienzo = Image.new("RGBA", (self.w, self.h), fondo)
+        else: lienzo.paste(fondo, (0, 0, lienzo.width, lienzo.height))
+        d = ImageDraw.Draw(lienzo)
+        for tipo, c, o in (self.escena_visible() if escena is None else escena):
+            if tipo == 'polygon':
+                xs = c[0::2]; ys = c[1::2]
+                if o.get('smooth'): d.rounded_rectangle((min(xs), min(ys), max(xs), max(ys)), radius=max(0, c[0] - min(xs)), fill=o.get('fill'))
+                else: d.polygon(list(zip(xs, ys)), fill=o.get('fill'))
+            elif tipo == 'oval': d.ellipse(c, fill=o.get('fill') or None)
+            elif tipo == 'text':
+                f = self.fuente(o['font'])
+                txt = CacheRotulos.envolver(o.get('text', ""), f, o['width']) if o.get('width') else o.get('text', "")
+                d.multiline_text((c[0], c[1]), txt, font=f, fill=o.get('fill'), anchor="mm", align="center")
+            elif tipo == 'image':
+                img = self.a_rgba(o['image']); x, y = c[0], c[1]
+                if o.get('anchor') == "center": x -= img.width / 2; y -= img.height / 2
+                lienzo.paste(img, (int(x), int(y)), img)
+        return lienzo
+
+# --- MOTOR DE RENDERIZADO ---
+class MotorTablero:
+    """Layout del tablero sobre una escena retenida; dibuja en cualquier DestinoRender."""
+    COLUMNAS_MAX = 4         # Más equipos que esto pasan a cuadrícula (hasta 4x4 con 16)
+    ALTO_ZONA_EQUIPOS = 0.68 # Fracción de la altura para la cuadrícula (el resto queda para el reloj)
+
+    def __init__(self, modelo, destino, pool=None, en_hilo_ui=None, al_listo=None, cache_img=None, cache_rotulos=None):
+        """Con 'cache_img'/'cache_rotulos' de otro motor (mismo tipo de destino) las salidas comparten assets."""
+        self.modelo = modelo; self.destino = destino
+        self.escena = {} # clave -> [id en el destino, coords, opciones]
+        self.cache_img = cache_img or CacheImagenes(convertir=destino.imagen, pool=pool, en_hilo_ui=en_hilo_ui, al_listo=al_listo) # Fondos/logos ya redimensionados
+        self.cache_rotulos = cache_rotulos or CacheRotulos(convertir=destino.imagen, px_por_punto=destino.px_por_punto) # Nombres con borde como bitmap
+        self.rotulos_vivos = {} # idx -> imagen mostrada (evita que la caché la libere en pantalla)
+        self.args_nombre = {}   # idx -> (x, y, font, fill, max_width) del último layout
+        self.tk_bg = None; self.tk_logo = None
+
+    # Escena retenida: cada elemento del tablero es un ítem etiquetado que se crea una sola vez.
+    # Los cambios de estado solo mueven (coords) o reconfiguran (itemconfig) lo necesario.
+    def tag_escena(self, clave): return "_".join(str(p) for p in clave)
+
+    def item_escena(self, tipo, clave, coords, **opts):
+        """Crea el ítem 'clave' si no existe; si existe, aplica solo coordenadas/opciones distintas."""
+        coords = [round(c, 2) for c in coords]
+        reg = self.escena.get(clave)
+        if reg is None:
+            iid = self.destino.crear(tipo, coords, ("escena", self.tag_escena(clave)), dict(opts))
+            self.escena[clave] = [iid, coords, dict(opts)]
+            return iid
+        iid, c_prev, o_prev = reg
+        if coords != c_prev: self.destino.mover(iid, coords); reg[1] = coords
+        self.config_item(clave, **opts)
+        return iid
+
+    def config_item(self, clave, **opts):
+        """itemconfig del ítem 'clave' limitado a las opciones que realmente cambiaron."""
+        reg = self.escena.get(clave)
+        if reg is None: return
+        cambios = {k: v for k, v in opts.items() if reg[2].get(k) is not v and reg[2].get(k) != v} # 'is' primero: evita comparar píxeles de imágenes PIL
+        if cambios: self.destino.configurar(reg[0], cambios); reg[2].update(cambios)
+
+    def ocultar_item(self, clave): self.config_item(clave, state="hidden")
+
+    def podar_escena(self, n_equipos):
+        """Elimina los ítems de equipos que ya no existen (al reducir el número de equipos)."""
+        for clave in [c for c in self.escena if len(c) > 1 and isinstance(c[1], int) and c[0] != 'fondo' and c[1] >= n_equipos]:
+            self.destino.borrar(self.escena.pop(clave)[0])
+        for i in [i for i in self.args_nombre if i >= n_equipos]: del self.args_nombre[i]
+        for idx in [idx for idx in self.rotulos_vivos if idx[0] >= n_equipos]: del self.rotulos_vivos[idx]
+
+    def rounded_rect_points(self, x1, y1, x2, y2, radius=25):
+        return [x1+radius, y1, x1+radius, y1, x2-radius, y1, x2-radius, y1, x2, y1, x2, y1+radius, x2, y1+radius, x2, y2-radius, x2, y2-radius, x2, y2, x2-radius, y2, x2-radius, y2, x1+radius, y2, x1+radius, y2, x1, y2, x1, y2-radius, x1, y2-radius, x1, y1+radius, x1, y1+radius, x1, y1]
+
+    def create_rounded_rect(self, x1, y1, x2, y2, radius=25, clave=None, **kwargs):
+        """Dibuja (o actualiza, si se da 'clave') un polígono con esquinas redondeadas."""
+        points = self.rounded_rect_points(x1, y1, x2, y2, radius)
+        if clave is None: return self.destino.crear('polygon', points, (), dict(kwargs, smooth=True))
+        return self.item_escena('polygon', clave, points, smooth=True, state="normal", **kwargs)
+
+    def draw_text_multiline(self, x, y, text, font, fill, max_width, clave=('nombre',)):
+        """Dibuja texto con ajuste automático de línea y outline opcional.
+
+        Con outline se usa un único bitmap pre-renderizado de CacheRotulos; solo si la fuente no
+        se puede resolver se recurre a las 8 copias negras desplazadas en el Canvas.
+        """
+        m = self.modelo
+        idx = clave[1:]; c_rotulo = ('rotulo',) + idx
+        outline = activo(m.var_outline)
+        img = self.cache_rotulos.obtener(text, font[0], font[1], fill, True, max_width) if outline else None
+        if img is not None:
+            self.rotulos_vivos[idx] = img
+            self.item_escena('image', c_rotulo, (x, y), image=img, anchor="center", state="normal")
+            self.ocultar_item(clave)
+            for k in range(8): self.ocultar_item(('sombra',) + idx + (k,))
+            return
+        self.ocultar_item(c_rotulo); self.rotulos_vivos.pop(idx, None)
+        k = 0; sombras_nuevas = outline and ('sombra',) + idx + (0,) not in self.escena
+        for ox in [-2, 0, 2]:
+            for oy in [-2, 0, 2]:
+                if ox == 0 and oy == 0: continue
+                c_sombra = ('sombra',) + idx + (k,); k += 1
+                if outline: iid_sombra = self.item_escena('text', c_sombra, (x+ox, y+oy), text=text, font=font, fill="black", width=max_width, justify="center", state="normal")
+                else: self.ocultar_item(c_sombra)
+        iid = self.item_escena('text', clave, (x, y), text=text, font=font, fill=fill, width=max_width, justify="center", state="normal")
+        if sombras_nuevas: self.destino.subir(iid, iid_sombra) # El nombre ya existía (outline apagado): queda sobre las sombras
+
+    def texto_timer(self):
+        """MM:SS redondeando hacia arriba (como un reloj de cuenta regresiva); 00:S.d en los últimos 10 s."""
+        m = self.modelo
+        rem = max(0.0, m.tiempo_restante)
+        if activo(m.var_decimas) and rem < 10:
+            t = math.ceil(rem * 10 - 1e-6)
+            return f"00:{t//10:02d}.{t%10}"
+        t = math.ceil(rem - 1e-6)
+        return f"{t//60:02d}:{t%60:02d}"
+
+    def refrescar_timer(self):
+        """Actualización mínima por tick: solo el texto del reloj."""
+        self.config_item(('timer', 'texto'), text=self.texto_timer())
+
+    def texto_total(self, idx):
+        """Acumulado del torneo y puesto en la tabla, bajo el marcador de la ronda."""
+        t = self.modelo.torneo
+        return f"Total {t.filas[idx]['puntos']}  ·  #{t.posicion(idx)}" if idx in t.filas else ""
+
+    def refrescar_equipo(self, idx):
+        """Actualiza nombre, puntos y faltas de un equipo sin recalcular la geometría."""
+        m = self.modelo; eq = m.equipos[idx]
+        if idx in self.args_nombre: # Re-renderiza el rótulo solo si el texto cambió (acierto de caché si no)
+            x, y, fnt, fill, max_width = self.args_nombre[idx]
+            self.draw_text_multiline(x, y, eq.nombre, fnt, fill, max_width, clave=('nombre', idx))
+        self.config_item(('puntos', idx), text=str(eq.puntos))
+        for k in range(3): self.config_item(('falta', idx, k), fill=m.color_faltas if k < eq.faltas else "#333")
+        if m.torneo.activo: # Un punto puede mover el puesto de otros equipos; solo cambian los textos distintos
+            for j in range(len(m.equipos)): self.config_item(('total', j), text=self.texto_total(j))
+
+    def redibujar_pantalla(self, event=None):
+        """Recalcula la geometría del tablero y actualiza en el destino solo los ítems afectados."""
+        m = self.modelo; w, h = self.destino.tamano()
+        
+        # 1. Fondo (siempre al fondo de la pila)
+        self.tk_bg = self.cache_img.obtener(m.fondo_path, (w, h), rapido=m.modo_rapido) if m.fondo_path else None
+        if self.tk_bg is not None: # Sin ruta o con el archivo ilegible, el fondo se oculta
+            nuevo = ('fondo',) not in self.escena
+            iid = self.item_escena('image', ('fondo',), (0, 0), image=self.tk_bg, anchor="nw", state="normal")
+            if nuevo: self.destino.bajar(iid)
+        else: self.ocultar_item(('fondo',))
+
+        # 2. Logo (justo encima del fondo)
+        medida = self.cache_img.medida(m.logo_path) if m.logo_path else None
+        self.tk_logo = self.cache_img.obtener(m.logo_path, tam_logo(medida, h, m.logo_scale), m.logo_scale, rapido=m.modo_rapido) if medida else None
+        if self.tk_logo is not None:
+            lx = w * 0.5; ly = (h * 0.5) + (h * m.logo_offset_y)
+            nuevo = ('logo',) not in self.escena
+            iid = self.item_escena('image', ('logo',), (lx, ly), image=self.tk_logo, anchor="center", state="normal")
+            if nuevo:
+                if ('fondo',) in self.escena: self.destino.subir(iid, self.escena[('fondo',)][0])
+                else: self.destino.bajar(iid)
+        else: self.ocultar_item(('logo',))
+
+        # Configuración Base
+        base_font = int(h * 0.05 * m.scale_factor)
+        cx = w * 0.5 + (w * m.offset_x)
+        
+        cy_equipos = (h * 0.5) + (h * m.offset_global_y)
+        if m.timer_position == "Arriba": cy_timer = (h * 0.15)
+        else: cy_timer = (h * 0.85)
+        cy_timer += (h * m.offset_timer)
+
+        # 3. Timer (Condicional)
+        if activo(m.ver_timer):
+            t_w = w * 0.25 * m.scale_factor * m.box_padding; t_h = h * 0.15 * m.scale_factor * m.box_padding
+            self.create_rounded_rect(cx-t_w/2, cy_timer-t_h/2, cx+t_w/2, cy_timer+t_h/2, radius=m.corner_radius, fill=m.color_caja, clave=('timer', 'caja'))
+            self.item_escena('text', ('timer', 'texto'), (cx, cy_timer), text=self.texto_timer(), fill="white", font=(m.font_score, int(base_font*2.5)), state="normal")
+        else:
+            self.ocultar_item(('timer', 'caja')); self.ocultar_item(('timer', 'texto'))
+
+        # 4. Equipos: una fila hasta COLUMNAS_MAX equipos; con más, cuadrícula (la última fila, centrada)
+        n = len(m.equipos)
+        filas = max(1, math.ceil(n / self.COLUMNAS_MAX)); cols = max(1, math.ceil(n / filas)); col_w = w / cols
+        if filas == 1: esc = 1.0
+        else: # Cada fila ocupa la franja libre del reloj; todo el bloque se escala para caber
+            esc = min(1.0, self.ALTO_ZONA_EQUIPOS / (filas * 0.46)); alto_fila = h * self.ALTO_ZONA_EQUIPOS / filas
+            y_zona = h * (0.04 if m.timer_position != "Arriba" else 0.28)
+        for i, eq in enumerate(m.equipos):
+            fila, col = divmod(i, cols); en_fila = min(cols, n - fila * cols)
+            x = ((col + (cols - en_fila) / 2) * col_w) + (col_w / 2) + (w * m.offset_x)
+            cy = cy_equipos if filas == 1 else y_zona + alto_fila * (fila + 0.5) - (h * 0.03 * esc) + (h * m.offset_global_y)
+            y_nm = cy - (h * 0.12 * esc) + (h * m.offset_names)
+            y_pts_base = cy + (h * 0.02 * esc) + (h * m.offset_scores)
+            
+            # Nombre
+            self.args_nombre[i] = (x, y_nm, (m.font_family, max(1, int(base_font * m.name_scale * esc)), "bold"), m.color_nombres, col_w*0.9)
+            self.draw_text_multiline(x, y_nm, eq.nombre, *self.args_nombre[i][2:], clave=('nombre', i))
+            
+            # Puntos
+            p_w = h * 0.2 * m.scale_factor * m.box_padding * esc; p_h = p_w * 0.8
+            self.create_rounded_rect(x-p_w/2, y_pts_base-p_h/2, x+p_w/2, y_pts_base+p_h/2, radius=m.corner_radius * esc, fill=m.color_caja, clave=('caja_puntos', i))
+            self.item_escena('text', ('puntos', i), (x, y_pts_base), text=str(eq.puntos), fill=m.color_puntos, font=(m.font_score, max(1, int(base_font*3*esc))), state="normal")
+            
+            # Acumulado del torneo (Condicional)
+            if m.torneo.activo:
+                self.item_escena('text', ('total', i), (x, y_pts_base + (h * 0.21 * esc)), text=self.texto_total(i), fill=m.color_nombres,
+                                 font=(m.font_family, max(1, int(base_font * 0.5 * esc)), "bold"), state="normal")
+            else: self.ocultar_item(('total', i))
+            
+            # Faltas (Condicional)
+            if activo(m.ver_faltas):
+                y_flt = y_pts_base + (h * 0.16 * esc)
+                f_box_w = p_w * 1.0; f_box_h = p_h * 0.4
+                self.create_rounded_rect(x-f_box_w/2, y_flt-f_box_h/2, x+f_box_w/2, y_flt+f_box_h/2, radius=m.corner_radius * esc, fill=m.color_caja, clave=('caja_faltas', i))
+                radius_c = f_box_h * 0.3; gap = radius_c * 0.5; start_x = x - ((radius_c*2 * 3 + gap * 2) / 2) + radius_c
+                for k in range(3):
+                    dot_x = start_x + (k * (radius_c*2 + gap)); color = m.color_faltas if k < eq.faltas else "#333"
+                    self.item_escena('oval', ('falta', i, k), (dot_x-radius_c, y_flt-radius_c, dot_x+radius_c, y_flt+radius_c), fill=color, outline="", state="normal")
+            else:
+                self.ocultar_item(('caja_faltas', i))
+                for k in range(3): self.ocultar_item(('falta', i, k))
+
+# --- SALIDA DE FOTOGRAMAS (OBS / COMPOSITOR LOCAL) ---
+class SalidaFrames:
+    """Tablero renderizado fuera de pantalla en fotogramas RGBA de tamaño fijo, con transparencia.
+
+    Tiene su propio MotorTablero sobre un DestinoPillow (mismo layout que el proyector). El hilo de
+    Tk solo actualiza la escena y, si hubo operaciones, entrega una copia al hilo escritor (buzón de
+    un lugar: si se atrasa, se queda con la última). El escritor saca fotogramas a 'fps' fijos:
+    rasteriza solo cuando llegó una escena nueva y si no repite los bytes del último fotograma.
+    El lienzo se reutiliza entre fotogramas. Con 'base' (el motor del proyector) comparte los originales
+    decodificados y el índice de fuentes; lo que falte se prepara en el pool antes del primer render.
+
+    Formatos:
+      'raw': RGBA crudo (w*h*4 bytes por fotograma) a un archivo o FIFO ('-' = salida estándar),
+             p. ej. ffmpeg -f rawvideo -pix_fmt rgba -s 1920x1080 -r 30 -i tablero.rgba ...
+      'png': 'ultimo.png' reemplazado de forma atómica (sirve como Fuente de Imagen en OBS) y una
+             secuencia frame_NNNNNN.png solo con los fotogramas que cambian: NNNNNN es el número de
+             fotograma a 'fps' fijos, así que los huecos de la numeración son repeticiones.
+    """
+    FORMATOS = ('raw', 'png')
+    RESOLUCIONES = {"720p": (1280, 720), "1080p": (1920, 1080), "4K": (3840, 2160)}
+
+    def __init__(self, modelo, ruta, w=1920, h=1080, fps=30, formato='raw', pool=None, en_hilo_ui=None, al_listo=None, base=None):
+        self.ruta = ruta; self.fps = fps; self.formato = formato
+        self.pool = pool; self.en_hilo_ui = en_hilo_ui or (lambda fn, *args: fn(*args))
+        self.destino = DestinoPillow(w, h)
+        self.motor = MotorTablero(modelo, self.destino, pool=pool, en_hilo_ui=en_hilo_ui, al_listo=al_listo)
+        self.destino.tipos = self.motor.cache_rotulos # Mismo índice de fuentes para rótulos y textos
+        if base is not None: # Las variantes no se comparten (otro destino), los originales y las fuentes sí
+            c, b = self.motor.cache_img, base.cache_img
+            c.originales, c.medidas, c.faltantes = b.originales, b.medidas, b.faltantes
+            self.motor.cache_rotulos.indice = base.cache_rotulos.indice
+        self.listo = False        # Primer render hecho (hasta entonces la aplicación no dibuja en este motor)
+        self.pixeles = bytearray(w * h * 4) # RGBA del último fotograma, que se repite mientras no cambie nada
+        self.lienzo = Image.frombuffer("RGBA", (w, h), self.pixeles, "raw", "RGBA", 0, 1)
+        self.lienzo.readonly = 0  # Pillow marca así los frombuffer: sin esto copiaría al dibujar; así dibuja en self.pixeles
+        self.png = io.BytesIO()   # Fotograma PNG codificado, mismo buffer en cada cuadro
+        self.hay_fotograma = False
+        self._escena_nueva = None # Buzón: copia de la escena pendiente de rasterizar
+        self._buzon = threading.Lock() # Tomar y vaciar el buzón es una sola operación para los dos hilos
+        self.salida = None; self.activo = False; self.error = None
+        self.escritos = 0; self.rasterizados = 0
+        self.fps_escritos = 0.0; self.fps_rasterizados = 0.0
+        self.ms_raster = EstadisticasTick(max_muestras=2000, titulo="Rasterizado", unidad="fotogramas")
+
+    def iniciar(self, fuentes_disco=None):
+        try:
+            if self.formato == 'png': os.makedirs(self.ruta, exist_ok=True)
+            elif hasattr(os, 'mkfifo') and self.ruta.endswith('.fifo') and not os.path.exists(self.ruta): os.mkfifo(self.ruta)
+        except OSError as e:
+            print(f"Advertencia: no se pudo abrir la salida de fotogramas {self.ruta}: {e}"); return False
+        self.activo = True
+        m, h = self.motor.modelo, self.destino.h
+        rutas = [(p, tamanos) for p, tamanos in ((m.fondo_path, lambda o: [(self.destino.tamano(), 1.0)]),
+                                                  (m.logo_path, lambda o: [(tam_logo(o.size, h, m.logo_scale), m.logo_scale)]))
+                 if p and p not in self.motor.cache_img.faltantes]
+        if self.pool is None:
+            try: listas = self._preparar(fuentes_disco, rutas)
+            except Exception as e: self._arrancar(None, e)
+            else: self._arrancar(listas)
+        else: self.pool.submit(self._preparar, fuentes_disco, rutas).add_done_callback(lambda f: self.en_hilo_ui(self._arrancar, None if f.exception() else f.result(), f.exception()))
+        return True
+
+    def _preparar(self, fuentes_disco, rutas):
+        """Pool: índice de fuentes si el proyector todavía no lo tiene, y fondo/logo ya redimensionados al tamaño del stream."""
+        rotulos, cache = self.motor.cache_rotulos, self.motor.cache_img
+        if not rotulos.indice: rotulos.indexar(fuentes_disco) # Con el índice en disco no recorre las carpetas de fuentes
+        listas = []
+        for path, tamanos in rutas:
+            orig = cache.originales.get(path)
+            try:
+                if orig is None: orig = Image.open(path); orig.load()
+                listas.append((path, orig, [(cache.normalizar(sz), sc, orig.resize(cache.normalizar(sz), Image.Resampling.LANCZOS)) for sz, sc in tamanos(orig)]))
+            except OSError as e: listas.append((path, e, []))
+        return listas
+
+    def _arrancar(self, listas, error=None):
+        """Hilo de Tk: instala lo preparado, hace el primer render (todo aciertos de caché) y lanza el escritor."""
+        if not self.activo: return # Se apagó mientras se preparaba
+        if error is not None: # Ej. DecompressionBombError: el stream se da de baja y vigilar_stream lo avisa
+            self.error = str(error) or type(error).__name__; self.activo = False
+            print(f"Salida de fotogramas detenida: {self.error}"); return
+        cache = self.motor.cache_img
+        for path, orig, variantes in listas:
+            if isinstance(orig, OSError): cache.faltante(path, orig); continue
+            cache.originales.setdefault(path, orig)
+            for sz, sc, img in variantes: cache.guardar((path, sz, sc), cache.convertir(img), True)
+        self.listo = True
+        self.motor.redibujar_pantalla(); self.publicar()
+        threading.Thread(target=self._escribir, name="match-frames", daemon=True).start()
+
+    def detener(self):
+        self.activo = False
+
+    def publicar(self):
+        """Hilo de Tk, después de actualizar el motor: entrega la escena solo si algo cambió."""
+        if self.listo and self.destino.tomar_ops():
+            escena = self.destino.escena_visible() # La copia se arma fuera del lock
+            with self._buzon: self._escena_nueva = escena
+
+    def _fotograma(self, escena):
+        t0 = time.perf_counter()
+        self.destino.rasterizar(fondo=(0, 0, 0, 0), escena=escena, lienzo=self.lienzo) # Queda en self.pixeles
+        if self.formato == 'png':
+            self.png.seek(0); self.png.truncate(); self.lienzo.save(self.png, "PNG", compress_level=1)
+            tmp = os.path.join(self.ruta, "ultimo.png.tmp")
+            self._volcar_png(tmp); os.replace(tmp, os.path.join(self.ruta, "ultimo.png"))
+        self.hay_fotograma = True
+        self.rasterizados += 1; self.ms_raster.registrar((time.perf_counter() - t0) * 1000)
+
+    def _volcar_png(self, ruta):
+        with open(ruta, "wb") as f, self.png.getbuffer() as datos: f.write(datos) # Sin copiar el BytesIO
+
+    def _escribir(self):
+        try:
+            if self.formato == 'raw': # En una FIFO, open() espera a que se conecte el lector (por eso en este hilo)
+                self.salida = sys.stdout.buffer if self.ruta == '-' else open(self.ruta, "wb", buffering=0)
+            periodo = 1 / self.fps; proximo = time.perf_counter()
+            t_ventana = proximo; esc_ventana = ras_ventana = 0
+            while self.activo:
+                with self._buzon: escena, self._escena_nueva = self._escena_nueva, None
+                if escena is not None: self._fotograma(escena)
+                if self.hay_fotograma:
+                    if self.formato == 'raw': self.salida.write(self.pixeles)
+                    elif escena is not None: # Repetir el PNG a 'fps' fijos llenaría el disco (~8 GB por hora)
+                        self._volcar_png(os.path.join(self.ruta, f"frame_{self.escritos + 1:06d}.png"))
+                    self.escritos += 1
+                ahora = time.perf_counter()
+                if ahora - t_ventana >= 1.0: # FPS de la última ventana de ~1 s
+                    self.fps_escritos = (self.escritos - esc_ventana) / (ahora - t_ventana)
+                    self.fps_rasterizados = (self.rasterizados - ras_ventana) / (ahora - t_ventana)
+                    t_ventana = ahora; esc_ventana = self.escritos; ras_ventana = self.rasterizados
+                proximo += periodo
+                if proximo > ahora: time.sleep(proximo - ahora)
+                else: proximo = ahora # Atrasado (lector lento): no se intenta recuperar con ráfagas
+        except (OSError, ValueError) as e: # El lector cerró la tubería
+            self.error = str(e); print(f"Salida de fotogramas detenida: {e}")
+        finally:
+            self.activo = False
+            if self.salida is not None and self.salida is not sys.stdout.buffer: self.salida.close()
+
+    def resumen(self):
+        if self.error: return f"stream detenido: {self.error}"
+        return (f"stream {self.destino.w}x{self.destino.h} {self.formato}: {self.fps_escritos:.1f} fps escritos · "
+                f"{self.fps_rasterizados:.1f} fps renderizados · raster {self.ms_raster.suma / max(1, self.ms_raster.n):.1f} ms")
+
+class ImproMatchApp(EstadoTablero):
+    def __init__(self):
+        self.arranque = CronometroArranque()
+        self.arranque.marca("imports")
+        # Configuración de la Ventana Principal (Panel de Control)
+        self.root = tk.Tk()
+        self.root.title("Match Impro Director - Acción Impro 2026")
+        self.root.geometry("540x950")
+        self.root.configure(bg="#222") # Tema Oscuro
+        
+        # Estado y diseño del tablero (ver EstadoTablero); los equipos se crean más abajo
+        EstadoTablero.__init__(self, n_equipos=0)
+        self.num_equipos_var = tk.IntVar(value=3) # Por defecto 3 equipos
+        
+        self._deadline = None # time.monotonic() en el que el reloj llega a cero (solo corriendo)
+        self._proximo_tick = None; self._after_reloj = None
+        self.stats_tick = EstadisticasTick()
+        self.perf = Perfilador(); self._after_lag = self._after_diag = None # Instrumentación (pestaña oculta, Ctrl+Mayús+D)
+        
+        # Slots para 6 efectos de sonido (la página activa de la biblioteca de bancos)
+        self.audio = MotorSonido(slots=BibliotecaSonidos.SLOTS) # Se inicia en el pool (ver audio_listo)
+        self._after_guardar_bib = None
+        
+        # Interruptores de Visibilidad (como variables de Tk para los Checkbutton)
+        self.ver_timer = tk.BooleanVar(value=self.ver_timer)
+        self.ver_faltas = tk.BooleanVar(value=self.ver_faltas)
+        self.var_outline = tk.BooleanVar(value=self.var_outline) # Borde negro en texto
+        self.var_decimas = tk.BooleanVar(value=self.var_decimas) # Décimas en los últimos 10 s
         
-        self.is_fullscreen = False # Estado de pantalla completa
+        # Trabajo en segundo plano: decodificar imágenes y sonidos sin congelar la interfaz.
+        # Los hilos nunca tocan Tk: sus resultados se encolan y se aplican desde drenar_cola_ui().
+        self.pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="match-trabajo")
+        self.cola_ui = queue.Queue()
+        self.trabajos_img = 0 # Cargas de imagen en curso (indicador en DISEÑO)
+        self.biblioteca = BibliotecaSonidos(os.path.join(DIR_DATOS, "biblioteca_sonidos.json"), self.audio, pool=self.pool, en_hilo_ui=self.en_hilo_ui)
+        self.sonidos = self.biblioteca.clips()
+        self._after_asentar = None
+        self.pool.submit(self.audio.iniciar).add_done_callback(lambda f: self.en_hilo_ui(self.audio_listo))
+        self.fuentes_disco = IndiceFuentesDisco(os.path.join(DIR_DATOS, "fuentes.json"))
+        self.presets = BibliotecaPresets(os.path.join(DIR_DATOS, "presets"))
+        self.arranque.marca("ventana de control y modelo")
+        
+        # Planificador de fotogramas: los eventos solo marcan el tablero como sucio
+        self.frame_budget_ms = 16 # Presupuesto mínimo entre fotogramas (~60 fps)
+        self._frame_pendiente = None
+        self._ultimo_frame = 0.0
+        self._sucio_layout = False; self._sucio_equipos = set()
+        self._ultimo_tamano = {} # ventana de tablero -> último tamaño visto en <Configure>
         
         # --- INICIALIZACIÓN DE VENTANAS ---
         # Ventana Secundaria (Proyector)
@@ -98,28 +1925,72 @@ class ImproMatchApp:
         # Doble clic solo en el lienzo para evitar conflictos
         self.canvas.bind("<Double-Button-1>", self.toggle_full_event) 
         
+        # Motor de render (layout + escena retenida) dibujando sobre el Canvas
+        self.motor = MotorTablero(self, DestinoTk(self.canvas, self.win_proj), pool=self.pool, en_hilo_ui=self.en_hilo_ui, al_listo=self.solicitar_redibujo)
+        self.salidas = [(self.win_proj, self.motor)] # Ventanas de tablero: el proyector y las que se abran después
+        self.stream = None # SalidaFrames (fotogramas para OBS), sin ventana
+        self.web = ServidorWeb(host="0.0.0.0" if "--lan" in sys.argv else "127.0.0.1"); self._reloj_web = None
+        self.pool.submit(self.motor.cache_rotulos.indexar, self.fuentes_disco).add_done_callback(lambda f: self.en_hilo_ui(self.solicitar_redibujo))
+        
         # Redibujar si se cambia el tamaño de la ventana
-        self.win_proj.bind("<Configure>", self.redibujar_pantalla)
+        self.win_proj.bind("<Configure>", self.on_configure)
 
-        # Cargar datos iniciales y construir interfaz
+        # Cargar datos iniciales (o recuperar el match anterior del diario) y construir interfaz
+        self.diario = DiarioMatch(os.path.join(DIR_DATOS, "diario"))
+        if self.diario.recuperar(self): self.num_equipos_var.set(len(self.equipos))
         self.reconstruir_equipos_data()
+        self.diario.iniciar(); self.diario.snapshot(DiarioMatch.capturar(self)) # Compacta lo recuperado
+        self.arranque.marca("proyector, motor y diario")
         self.construir_panel_control()
+        self.arranque.marca("panel (EN VIVO)")
+        self.match.suscribir(self.tablero_al_cambiar)
+        self.match.suscribir(self.panel_al_cambiar, ('nombre', 'puntos', 'equipos'))
+        self.match.suscribir(self.tabla_al_cambiar)
+        self.match.suscribir(self.diario_al_cambiar)
         self.redibujar_pantalla()
+        self.drenar_cola_ui()
+        
+        # Control remoto (pad, teléfono): localhost salvo con --lan; en la red, solo comandos con el token
+        ruta_token = os.path.join(DIR_DATOS, "control_token.txt")
+        if "--lan" in sys.argv: self.control = ServidorControl(host="0.0.0.0", token=ServidorControl.token_guardado(ruta_token))
+        else: self.control = ServidorControl(host="127.0.0.1")
+        self._t_lbl_remoto = 0.0
+        if self.control.iniciar():
+            self.drenar_comandos()
+            if self.control.token: print(f"Control remoto en la red: token {self.control.token} (en {ruta_token})")
+        self.lbl_remoto.config(text=f"Remoto UDP {self.control.host}:{self.control.puerto}" if self.control.activo else "Remoto desactivado")
+        
+        self.ir_a_banco(self.biblioteca.pagina)
+        self.root.protocol("WM_DELETE_WINDOW", self.al_cerrar)
+        self.arranque.marca("primer fotograma")
+        self.root.after_idle(self.arranque_completo)
         
         self.root.mainloop() # Bucle principal de la aplicación
 
+    def arranque_completo(self):
+        """Primer instante ocioso del bucle de Tk: las ventanas ya están mapeadas y pintadas."""
+        self.arranque.marca("ventanas visibles")
+        if "--tiempos" in sys.argv: print(self.arranque.reporte())
+
+    def audio_listo(self):
+        """El mezclador terminó de iniciarse en el pool: decodifica la página activa."""
+        if hasattr(self, 'lbl_latencia'): self.lbl_latencia.config(text=self.audio.resumen() if self.audio.activo else "Sin dispositivo de audio")
+        if self.audio.activo: self.ir_a_banco(self.biblioteca.pagina)
+
+    def familias_fuentes(self):
+        """Familias para los combos de fuentes: de disco si la firma no cambió; si no, se enumeran con Tk."""
+        familias = self.fuentes_disco.obtener('familias')
+        if familias is None:
+            familias = sorted(f for f in font.families() if not f.startswith("@"))
+            self.fuentes_disco.guardar('familias', familias)
+        return familias
+
     # --- LÓGICA DE DATOS ---
     def reconstruir_equipos_data(self):
-        """Ajusta la lista de equipos según el número seleccionado (2 a 4)."""
-        n = self.num_equipos_var.get()
-        actual = len(self.equipos)
-        if n > actual:
-            colores_default = ["ROJO", "AMARILLO", "AZUL", "VERDE"]
-            for i in range(actual, n):
-                nom = colores_default[i] if i < 4 else f"EQ {i+1}"
-                self.equipos.append({'nombre': nom, 'puntos': 0, 'faltas': 0})
-        elif n < actual:
-            self.equipos = self.equipos[:n]
+        """Ajusta la lista de equipos según el número seleccionado (2 a Match.MAX_EQUIPOS)."""
+        try: n = int(self.num_equipos_var.get())
+        except (tk.TclError, ValueError): return
+        self.ajustar_equipos(max(2, min(Match.MAX_EQUIPOS, n)))
 
     # --- INTERFAZ GRÁFICA (PANEL DE CONTROL) ---
     def construir_panel_control(self):
@@ -149,11 +2020,16 @@ class ImproMatchApp:
         tk.Button(f_btn, text="SET", command=self.set_tiempo).pack(side="left")
         tk.Button(f_btn, text="▶ INICIO", bg="#afa", command=self.iniciar_tiempo).pack(side="left", padx=5)
         tk.Button(f_btn, text="⏸ PAUSA", bg="#fea", command=self.pausar_tiempo).pack(side="left")
+        self.lbl_jitter = tk.Label(fr_t, text=self.stats_tick.resumen(), bg="#222", fg="#666", font=("Arial", 7))
+        self.lbl_jitter.pack()
+        self.lbl_remoto = tk.Label(fr_t, text="", bg="#222", fg="#666", font=("Arial", 7))
+        self.lbl_remoto.pack()
 
         # Configuración rápida de Equipos
         fr_cfg = tk.Frame(tab_game, bg="#222"); fr_cfg.pack(fill="x", padx=10)
         tk.Label(fr_cfg, text="Equipos:", fg="#aaa", bg="#222").pack(side="left")
-        tk.Spinbox(fr_cfg, from_=2, to=4, textvariable=self.num_equipos_var, width=3, command=self.actualizar_estructura_equipos).pack(side="left", padx=5)
+        tk.Spinbox(fr_cfg, from_=2, to=Match.MAX_EQUIPOS, textvariable=self.num_equipos_var, width=3, command=self.actualizar_estructura_equipos).pack(side="left", padx=5)
+        tk.Button(fr_cfg, text="🧹 Nuevo Match", bg="#444", fg="white", font=("Arial", 8), command=self.nuevo_match).pack(side="right")
         
         # Contenedor dinámico de equipos
         self.frame_container_eq = tk.Frame(tab_game, bg="#222")
@@ -163,24 +2039,60 @@ class ImproMatchApp:
         # Botonera de Sonidos (Soundbar)
         fr_snd_live = tk.LabelFrame(tab_game, text="EFECTOS", bg="#222", fg="#00d4ff", font=("Arial", 10, "bold"))
         fr_snd_live.pack(fill="x", padx=10, pady=10, side="bottom")
+        # Navegación entre bancos (páginas de 6 efectos)
+        f_pag = tk.Frame(fr_snd_live, bg="#222"); f_pag.grid(row=0, column=0, columnspan=3, sticky="ew")
+        tk.Button(f_pag, text="◀", bg="#444", fg="white", command=lambda: self.ir_a_banco(self.biblioteca.pagina - 1)).pack(side="left")
+        tk.Button(f_pag, text="▶", bg="#444", fg="white", command=lambda: self.ir_a_banco(self.biblioteca.pagina + 1)).pack(side="right")
+        self.lbl_banco_live = tk.Label(f_pag, text="", bg="#222", fg="#00d4ff", font=("Arial", 9, "bold")); self.lbl_banco_live.pack(fill="x")
         self.botones_sonido_live = []
-        for i in range(6):
+        for i in range(BibliotecaSonidos.SLOTS):
             # Botones grandes para lanzar audio
             btn = tk.Button(fr_snd_live, text=self.sonidos[i]['name'], bg="#333", fg="white", font=("Arial", 9, "bold"), height=2, command=lambda x=i: self.play_sound(x))
-            r = 0 if i < 3 else 1; c = i % 3
+            r = 1 if i < 3 else 2; c = i % 3
             btn.grid(row=r, column=c, sticky="nsew", padx=2, pady=2)
             fr_snd_live.grid_columnconfigure(c, weight=1)
             self.botones_sonido_live.append(btn)
 
-        # === PESTAÑA 2: DISEÑO (Personalización) ===
-        tab_design = tk.Frame(nb, bg="#222")
-        nb.add(tab_design, text="🎨 DISEÑO")
-        
+        # Las demás pestañas se construyen la primera vez que se seleccionan
+        self.pestanas_pendientes = {}
+        for texto, construir in (("🎨 DISEÑO", self.construir_tab_diseno), ("⚙ SONIDOS", self.construir_tab_sonidos), ("🏆 TORNEO", self.construir_tab_torneo)):
+            tab = tk.Frame(nb, bg="#222"); nb.add(tab, text=texto)
+            self.pestanas_pendientes[str(tab)] = (tab, construir)
+        # Pestaña oculta de diagnóstico: aparece con Ctrl+Mayús+D (o al arrancar con --diagnostico)
+        tab = tk.Frame(nb, bg="#222"); nb.add(tab, text="🩺 DIAGNÓSTICO", state="normal" if "--diagnostico" in sys.argv else "hidden")
+        self.pestanas_pendientes[str(tab)] = (tab, self.construir_tab_diagnostico)
+        self.root.bind("<Control-D>", lambda e: (nb.tab(tab, state="normal"), nb.select(tab)))
+        nb.bind("<<NotebookTabChanged>>", lambda e: self.construir_pestana(nb.select()))
+
+    def construir_pestana(self, nombre):
+        """Construye una pestaña diferida al seleccionarla por primera vez."""
+        pendiente = self.pestanas_pendientes.pop(nombre, None)
+        if pendiente:
+            t0 = time.perf_counter(); tab, construir = pendiente; construir(tab)
+            if "--tiempos" in sys.argv: print(f"Pestaña construida en {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    # === PESTAÑA 2: DISEÑO (Personalización) ===
+    def construir_tab_diseno(self, tab_design):
+        # Presets de show (diseño + imágenes horneadas + banco de sonidos)
+        fr_pre = tk.LabelFrame(tab_design, text="Presets de Show", bg="#222", fg="#00d4ff")
+        fr_pre.pack(fill="x", padx=10, pady=5)
+        self.cb_preset = ttk.Combobox(fr_pre, values=self.presets.nombres(), width=22); self.cb_preset.pack(side="left", padx=5, pady=2)
+        self.cb_preset.bind("<<ComboboxSelected>>", lambda e: self.aplicar_preset(self.cb_preset.get()))
+        tk.Button(fr_pre, text="▶ Aplicar", bg="#0a0", fg="white", command=lambda: self.aplicar_preset(self.cb_preset.get())).pack(side="left", padx=2)
+        tk.Button(fr_pre, text="💾 Guardar", bg="#444", fg="white", command=self.guardar_preset).pack(side="left", padx=2)
+        tk.Button(fr_pre, text="🗑", bg="#522", fg="white", command=self.borrar_preset).pack(side="left", padx=2)
+        self.sliders_diseno = {} # atributo -> tk.Scale (para reflejar un preset aplicado)
+
         # Carga de Imágenes
         fr_img = tk.LabelFrame(tab_design, text="Imágenes (Fondo y Logo)", bg="#222", fg="white")
         fr_img.pack(fill="x", padx=10, pady=5)
         tk.Button(fr_img, text="🖼 Cambiar Fondo", command=self.cambiar_fondo, bg="#444", fg="white").pack(fill="x", padx=5, pady=2)
         
+        # Estado de las cargas en segundo plano
+        f_est_img = tk.Frame(fr_img, bg="#222"); f_est_img.pack(fill="x", padx=5)
+        self.pb_img = ttk.Progressbar(f_est_img, mode="indeterminate", length=80); self.pb_img.pack(side="right")
+        self.lbl_estado_img = tk.Label(f_est_img, text="", bg="#222", fg="#888", font=("Arial", 8), anchor="w"); self.lbl_estado_img.pack(side="left", fill="x", expand=True)
+        
         f_logo = tk.Frame(fr_img, bg="#222"); f_logo.pack(fill="x", pady=5)
         tk.Button(f_logo, text="⭐ Cargar Logo", command=self.cambiar_logo, bg="#444", fg="white").pack(side="left", padx=5, expand=True)
         tk.Button(f_logo, text="❌ Quitar", command=self.quitar_logo, bg="#522", fg="white").pack(side="left", padx=5)
@@ -188,25 +2100,27 @@ class ImproMatchApp:
         # Sliders para el Logo
         f_sl_logo = tk.Frame(fr_img, bg="#222"); f_sl_logo.pack(fill="x")
         tk.Label(f_sl_logo, text="Tam. Logo", bg="#222", fg="#aaa", font=("Arial", 8)).pack(side="left")
-        tk.Scale(f_sl_logo, from_=0.1, to=2.0, resolution=0.1, orient="horizontal", bg="#222", fg="white", bd=0, highlightthickness=0, command=lambda v: self.upd_lay('logo_scale', v)).pack(side="left", fill="x", expand=True)
+        self.sliders_diseno['logo_scale'] = tk.Scale(f_sl_logo, from_=0.1, to=2.0, resolution=0.1, orient="horizontal", bg="#222", fg="white", bd=0, highlightthickness=0, command=lambda v: self.upd_lay('logo_scale', v))
+        self.sliders_diseno['logo_scale'].set(self.logo_scale); self.sliders_diseno['logo_scale'].pack(side="left", fill="x", expand=True)
         
         f_sl_logoy = tk.Frame(fr_img, bg="#222"); f_sl_logoy.pack(fill="x")
         tk.Label(f_sl_logoy, text="Pos. Y Logo", bg="#222", fg="#aaa", font=("Arial", 8)).pack(side="left")
-        tk.Scale(f_sl_logoy, from_=-0.5, to=0.5, resolution=0.01, orient="horizontal", bg="#222", fg="white", bd=0, highlightthickness=0, command=lambda v: self.upd_lay('logo_offset_y', v)).pack(side="left", fill="x", expand=True)
-        self.upd_lay('logo_offset_y', self.logo_offset_y)
+        self.sliders_diseno['logo_offset_y'] = tk.Scale(f_sl_logoy, from_=-0.5, to=0.5, resolution=0.01, orient="horizontal", bg="#222", fg="white", bd=0, highlightthickness=0, command=lambda v: self.upd_lay('logo_offset_y', v))
+        self.sliders_diseno['logo_offset_y'].set(self.logo_offset_y); self.sliders_diseno['logo_offset_y'].pack(side="left", fill="x", expand=True)
 
         # Visibilidad
         fr_vis = tk.LabelFrame(tab_design, text="Visibilidad", bg="#222", fg="#00ff88")
         fr_vis.pack(fill="x", padx=10, pady=5)
-        tk.Checkbutton(fr_vis, text="Timer", variable=self.ver_timer, bg="#222", fg="white", selectcolor="#444", command=self.redibujar_pantalla).pack(side="left", padx=10)
-        tk.Checkbutton(fr_vis, text="Faltas", variable=self.ver_faltas, bg="#222", fg="white", selectcolor="#444", command=self.redibujar_pantalla).pack(side="left", padx=10)
+        tk.Checkbutton(fr_vis, text="Timer", variable=self.ver_timer, bg="#222", fg="white", selectcolor="#444", command=lambda: self.cambiar_interruptor('ver_timer')).pack(side="left", padx=10)
+        tk.Checkbutton(fr_vis, text="Faltas", variable=self.ver_faltas, bg="#222", fg="white", selectcolor="#444", command=lambda: self.cambiar_interruptor('ver_faltas')).pack(side="left", padx=10)
+        tk.Checkbutton(fr_vis, text="Décimas (<10s)", variable=self.var_decimas, bg="#222", fg="white", selectcolor="#444", command=lambda: self.cambiar_interruptor('var_decimas')).pack(side="left", padx=10)
 
         # Colores
         fr_col = tk.LabelFrame(tab_design, text="Colores", bg="#222", fg="white")
         fr_col.pack(fill="x", padx=10, pady=5)
         def pick(t): # Helper para elegir color
             c = colorchooser.askcolor()[1]
-            if c: setattr(self, f"color_{t}", c); self.redibujar_pantalla()
+            if c: setattr(self, f"color_{t}", c); self.anotar('diseno', attr=f"color_{t}", v=c); self.solicitar_redibujo()
         tk.Button(fr_col, text="Nombres", bg=self.color_nombres, command=lambda: pick('nombres')).pack(side="left", expand=True, fill="x", padx=1)
         tk.Button(fr_col, text="Puntos", bg=self.color_puntos, command=lambda: pick('puntos')).pack(side="left", expand=True, fill="x", padx=1)
         tk.Button(fr_col, text="Faltas", bg=self.color_faltas, command=lambda: pick('faltas')).pack(side="left", expand=True, fill="x", padx=1)
@@ -232,6 +2146,7 @@ class ImproMatchApp:
             tk.Label(f, text=txt, bg="#222", fg="#ddd", width=20, anchor="w", font=("Arial", 8)).pack(side="left")
             s = tk.Scale(f, from_=vmin, to=vmax, resolution=res, orient="horizontal", bg="#222", fg="white", highlightthickness=0, bd=0, command=lambda v: self.upd_lay(attr, v))
             s.set(getattr(self, attr)); s.pack(side="right", fill="x", expand=True)
+            self.sliders_diseno[attr] = s
 
         mk_sl("Pos. Vertical (Todo)", -0.5, 0.5, 0.01, 'offset_global_y')
         mk_sl("Offset Nombres", -0.2, 0.2, 0.01, 'offset_names')
@@ -241,81 +2156,305 @@ class ImproMatchApp:
         mk_sl("Tam. Nombres", 0.5, 3.0, 0.1, 'name_scale')
         mk_sl("Zoom General", 0.5, 2.0, 0.1, 'scale_factor')
         mk_sl("Margen Cajas", 0.5, 2.0, 0.1, 'box_padding')
-        tk.Checkbutton(fr_lay, text="Outline Nombres (Borde Negro)", variable=self.var_outline, bg="#222", fg="white", selectcolor="#444", command=self.redibujar_pantalla).pack(pady=5)
+        tk.Checkbutton(fr_lay, text="Outline Nombres (Borde Negro)", variable=self.var_outline, bg="#222", fg="white", selectcolor="#444", command=lambda: self.cambiar_interruptor('var_outline')).pack(pady=5)
 
         # Selección de Fuentes
         fr_f = tk.LabelFrame(tab_design, text="Fuentes", bg="#222", fg="white")
         fr_f.pack(fill="x", padx=10)
-        lst_f = [f for f in font.families() if not f.startswith("@")]; lst_f.sort()
+        lst_f = self.familias_fuentes()
         
-        cb_fn = ttk.Combobox(fr_f, values=lst_f, state="readonly"); cb_fn.set("Arial"); cb_fn.pack(fill="x", pady=2)
+        self.cb_fuente_nombres = cb_fn = ttk.Combobox(fr_f, values=lst_f, state="readonly"); cb_fn.set(self.font_family); cb_fn.pack(fill="x", pady=2)
         cb_fn.bind("<<ComboboxSelected>>", lambda e: self.set_font(cb_fn.get(), 'names'))
         
-        cb_fs = ttk.Combobox(fr_f, values=lst_f, state="readonly"); cb_fs.set("Impact"); cb_fs.pack(fill="x", pady=2)
+        self.cb_fuente_puntos = cb_fs = ttk.Combobox(fr_f, values=lst_f, state="readonly"); cb_fs.set(self.font_score); cb_fs.pack(fill="x", pady=2)
         cb_fs.bind("<<ComboboxSelected>>", lambda e: self.set_font(cb_fs.get(), 'score'))
 
-        # === PESTAÑA 3: CONFIGURACIÓN DE SONIDOS ===
-        tab_fx = tk.Frame(nb, bg="#222")
-        nb.add(tab_fx, text="⚙ SONIDOS")
-        tk.Label(tab_fx, text="CONFIGURAR BOTONES (6 SLOTS)", bg="#222", fg="#00d4ff", font=("Arial", 12, "bold")).pack(pady=10)
+        # Salidas adicionales (más ventanas de tablero y página web)
+        fr_sal = tk.LabelFrame(tab_design, text="Salidas", bg="#222", fg="white")
+        fr_sal.pack(fill="x", padx=10, pady=5)
+        f_sal = tk.Frame(fr_sal, bg="#222"); f_sal.pack(fill="x", padx=5, pady=2)
+        tk.Button(f_sal, text="➕ Ventana de Tablero", bg="#444", fg="white", command=self.abrir_salida).pack(side="left")
+        self.var_web = tk.BooleanVar(value=self.web.activo)
+        tk.Checkbutton(f_sal, text="Página web", variable=self.var_web, bg="#222", fg="white", selectcolor="#444", command=self.cambiar_web).pack(side="left", padx=10)
+        # Stream de fotogramas RGBA con transparencia para OBS / compositor local
+        f_str = tk.Frame(fr_sal, bg="#222"); f_str.pack(fill="x", padx=5, pady=2)
+        self.var_frames = tk.BooleanVar(value=self.stream is not None)
+        tk.Checkbutton(f_str, text="Stream (OBS)", variable=self.var_frames, bg="#222", fg="white", selectcolor="#444", command=self.cambiar_salida_frames).pack(side="left")
+        self.cb_stream_fmt = ttk.Combobox(f_str, values=SalidaFrames.FORMATOS, state="readonly", width=5); self.cb_stream_fmt.set("raw"); self.cb_stream_fmt.pack(side="left", padx=2)
+        self.cb_stream_res = ttk.Combobox(f_str, values=list(SalidaFrames.RESOLUCIONES), state="readonly", width=6); self.cb_stream_res.set("1080p"); self.cb_stream_res.pack(side="left", padx=2)
+        self.cb_stream_fps = ttk.Combobox(f_str, values=["30", "60"], state="readonly", width=3); self.cb_stream_fps.set("30"); self.cb_stream_fps.pack(side="left", padx=2)
+        tk.Label(f_str, text="fps", bg="#222", fg="white").pack(side="left")
+        self.lbl_salidas = tk.Label(fr_sal, text="", bg="#222", fg="#888", font=("Arial", 8), anchor="w"); self.lbl_salidas.pack(fill="x", padx=5)
+        self.actualizar_lbl_salidas()
+
+    # === PESTAÑA 3: CONFIGURACIÓN DE SONIDOS ===
+    def construir_tab_sonidos(self, tab_fx):
+        tk.Label(tab_fx, text="CONFIGURAR BOTONES (6 SLOTS POR BANCO)", bg="#222", fg="#00d4ff", font=("Arial", 12, "bold")).pack(pady=10)
+        
+        # Selección y nombre del banco activo
+        fr_bank = tk.Frame(tab_fx, bg="#222"); fr_bank.pack(fill="x", padx=10, pady=2)
+        self.cb_banco = ttk.Combobox(fr_bank, state="readonly", width=18); self.cb_banco.pack(side="left")
+        self.cb_banco.bind("<<ComboboxSelected>>", lambda e: self.ir_a_banco(self.cb_banco.current()))
+        self.en_banco = tk.Entry(fr_bank, width=14); self.en_banco.pack(side="left", padx=5)
+        self.en_banco.bind("<KeyRelease>", lambda e: self.renombrar_banco(self.en_banco.get()))
+        tk.Button(fr_bank, text="➕ Banco", command=self.nuevo_banco, bg="#444", fg="white").pack(side="right")
         
         # Generar filas de configuración
-        for i in range(6):
+        self.entries_sonido = []; self.lbls_sonido = []; self.vars_stream = []
+        for i in range(BibliotecaSonidos.SLOTS):
             fr_row = tk.Frame(tab_fx, bg="#333", pady=5); fr_row.pack(fill="x", padx=10, pady=2)
             tk.Label(fr_row, text=f"#{i+1}", bg="#333", fg="#888", width=3).pack(side="left")
             
             # Editar Nombre
             en_name = tk.Entry(fr_row, width=15); en_name.insert(0, self.sonidos[i]['name']); en_name.pack(side="left", padx=5)
             en_name.bind("<KeyRelease>", lambda event, idx=i, widget=en_name: self.update_sound_name(idx, widget.get()))
+            self.entries_sonido.append(en_name)
             
             # Cargar Archivo
             tk.Button(fr_row, text="📂", command=lambda x=i: self.cargar_sonido(x)).pack(side="left", padx=2)
             
             # Estado
             lbl_status = tk.Label(fr_row, text="Vacío", bg="#333", fg="#666", width=15, anchor="w", font=("Arial", 8)); lbl_status.pack(side="left", padx=5)
-            self.sonidos[i]['lbl_widget'] = lbl_status
+            self.lbls_sonido.append(lbl_status)
             
             # Test Play
             tk.Button(fr_row, text="▶", command=lambda x=i: self.play_sound(x), bg="#444", fg="white").pack(side="right", padx=5)
+            
+            # Streaming desde disco (música de fondo larga)
+            v = tk.BooleanVar(value=self.sonidos[i]['stream']); self.vars_stream.append(v)
+            tk.Checkbutton(fr_row, text="Stream", variable=v, bg="#333", fg="#aaa", selectcolor="#444", font=("Arial", 7), command=lambda x=i: self.cambiar_stream(x)).pack(side="right")
+        
+        # Memoria para audio decodificado
+        fr_mem = tk.Frame(tab_fx, bg="#222"); fr_mem.pack(fill="x", padx=10, pady=2)
+        tk.Label(fr_mem, text="Memoria audio (MB):", bg="#222", fg="#aaa", font=("Arial", 8)).pack(side="left")
+        self.var_presupuesto = tk.IntVar(value=self.biblioteca.presupuesto_mb)
+        tk.Spinbox(fr_mem, from_=16, to=2048, increment=16, textvariable=self.var_presupuesto, width=5, command=self.cambiar_presupuesto_audio).pack(side="left", padx=5)
+        self.lbl_mem_audio = tk.Label(fr_mem, text="", bg="#222", fg="#666", font=("Arial", 8)); self.lbl_mem_audio.pack(side="left")
+        
+        # Parámetros del mezclador (latencia)
+        fr_mix = tk.LabelFrame(tab_fx, text="MEZCLADOR (LATENCIA)", bg="#222", fg="white")
+        fr_mix.pack(fill="x", padx=10, pady=10)
+        f_mix = tk.Frame(fr_mix, bg="#222"); f_mix.pack(fill="x", pady=2)
+        tk.Label(f_mix, text="Hz", bg="#222", fg="#aaa").pack(side="left")
+        self.cb_mix_freq = ttk.Combobox(f_mix, values=[22050, 44100, 48000], state="readonly", width=6); self.cb_mix_freq.set(self.audio.frecuencia); self.cb_mix_freq.pack(side="left", padx=2)
+        tk.Label(f_mix, text="Buffer", bg="#222", fg="#aaa").pack(side="left")
+        self.cb_mix_buf = ttk.Combobox(f_mix, values=[128, 256, 512, 1024, 2048], state="readonly", width=5); self.cb_mix_buf.set(self.audio.buffer); self.cb_mix_buf.pack(side="left", padx=2)
+        tk.Label(f_mix, text="Canales", bg="#222", fg="#aaa").pack(side="left")
+        self.cb_mix_ch = ttk.Combobox(f_mix, values=[1, 2], state="readonly", width=2); self.cb_mix_ch.set(self.audio.canales); self.cb_mix_ch.pack(side="left", padx=2)
+        tk.Button(f_mix, text="Aplicar", command=self.aplicar_mezclador, bg="#444", fg="white").pack(side="right", padx=5)
+        self.lbl_latencia = tk.Label(fr_mix, text=self.audio.resumen() if self.audio.activo else "Sin dispositivo de audio", bg="#222", fg="#666", font=("Arial", 7))
+        self.lbl_latencia.pack(fill="x")
+        self.actualizar_slots_sonido()
+
+    # === PESTAÑA 4: TORNEO (rondas y tabla acumulada) ===
+    def construir_tab_torneo(self, tab_torneo):
+        fr_tor = tk.Frame(tab_torneo, bg="#222"); fr_tor.pack(fill="x", padx=10, pady=10)
+        self.var_torneo = tk.BooleanVar(value=self.torneo.activo)
+        tk.Checkbutton(fr_tor, text="Modo torneo", variable=self.var_torneo, bg="#222", fg="white", selectcolor="#444", command=self.cambiar_modo_torneo).pack(side="left")
+        tk.Button(fr_tor, text="🏁 Cerrar Ronda", bg="#0a0", fg="white", font=("Arial", 9, "bold"), command=self.cerrar_ronda).pack(side="right")
+        self.lbl_ronda = tk.Label(fr_tor, text="", bg="#222", fg="#00d4ff", font=("Arial", 11, "bold")); self.lbl_ronda.pack(side="right", padx=10)
+        
+        cols_tabla = (("pos", "#", 30), ("nombre", "Equipo", 170), ("puntos", "Pts", 50), ("faltas", "Faltas", 50), ("ganadas", "Rondas ganadas", 100))
+        self.tabla_torneo = ttk.Treeview(tab_torneo, columns=[c[0] for c in cols_tabla], show="headings", height=Match.MAX_EQUIPOS)
+        for col, titulo, ancho in cols_tabla: self.tabla_torneo.heading(col, text=titulo); self.tabla_torneo.column(col, width=ancho, anchor="center")
+        self.tabla_torneo.pack(fill="x", padx=10)
+        
+        tk.Label(tab_torneo, text="RONDAS CERRADAS", bg="#222", fg="#aaa", font=("Arial", 8)).pack(anchor="w", padx=10, pady=(10, 0))
+        self.lista_rondas = tk.Listbox(tab_torneo, bg="#111", fg="white", height=8, font=("Arial", 8), highlightthickness=0)
+        self.lista_rondas.pack(fill="both", expand=True, padx=10, pady=5)
+        self.dibujar_tabla_torneo()
+
+    # === PESTAÑA OCULTA: DIAGNÓSTICO (rendimiento) ===
+    def construir_tab_diagnostico(self, tab_diag):
+        fr = tk.Frame(tab_diag, bg="#222"); fr.pack(fill="x", padx=10, pady=10)
+        self.var_perf = tk.BooleanVar(value=self.perf.activo)
+        tk.Checkbutton(fr, text="Medir", variable=self.var_perf, bg="#222", fg="white", selectcolor="#444", command=self.cambiar_diagnostico).pack(side="left")
+        tk.Button(fr, text="💾 Exportar CSV/JSON", bg="#444", fg="white", command=self.exportar_diagnostico).pack(side="right")
+        tk.Button(fr, text="Reiniciar", bg="#444", fg="white", command=lambda: (self.perf.reiniciar(), self.actualizar_diagnostico())).pack(side="right", padx=5)
+
+        cols_tabla = (("metrica", "Métrica (ms)", 190), ("n", "n", 55), ("media", "Media", 60), ("p50", "p50", 55), ("p95", "p95", 55), ("max", "Máx", 60))
+        self.tabla_diag = ttk.Treeview(tab_diag, columns=[c[0] for c in cols_tabla], show="headings", height=16)
+        for col, titulo, ancho in cols_tabla: self.tabla_diag.heading(col, text=titulo); self.tabla_diag.column(col, width=ancho, anchor="e" if col != "metrica" else "w")
+        self.tabla_diag.pack(fill="x", padx=10)
+        self.lbl_diag = tk.Label(tab_diag, text="", bg="#222", fg="#888", font=("Arial", 8), justify="left", anchor="w", wraplength=480)
+        self.lbl_diag.pack(fill="x", padx=10, pady=5)
+        self.actualizar_diagnostico()
+
+    def instrumentar_motor(self, motor):
+        self.perf.medir(motor, 'draw_text_multiline', 'draw_text_multiline')
+        self.perf.medir(motor.cache_img, 'obtener', 'imagen: obtener/redimensionar')
+        self.perf.medir(motor.cache_img, 'convertir', 'imagen: PhotoImage')
+
+    def cambiar_diagnostico(self):
+        """Encender envuelve los métodos del camino caliente; apagar los deja como estaban (costo cero)."""
+        if self.var_perf.get() and not self.perf.activo:
+            for attr in ('render_frame', 'redibujar_pantalla', 'loop', 'play_sound'): self.perf.medir(self, attr, attr)
+            self.perf.contar(self, 'solicitar_redibujo', 'solicitar_redibujo')
+            for _, motor in self.salidas: self.instrumentar_motor(motor)
+            self.perf.encender(); self.sondear_lag(); self.actualizar_diagnostico()
+        elif not self.var_perf.get() and self.perf.activo:
+            self.perf.apagar()
+            if self._after_lag: self.root.after_cancel(self._after_lag); self._after_lag = None
+            self.actualizar_diagnostico() # Muestra 'Detenido' y corta el refresco
+
+    def sondear_lag(self, t_pedido=None):
+        """Cada 50 ms, mientras se mide: cuánto tarda de más el bucle de Tk en correr un after."""
+        ahora = time.perf_counter()
+        if t_pedido is not None: self.perf.lag.registrar(max(0.0, (ahora - t_pedido) * 1000 - 50))
+        self._after_lag = self.root.after(50, self.sondear_lag, ahora)
+
+    def extras_diagnostico(self):
+        """Estadísticas que el programa ya lleva siempre (no dependen de 'Medir')."""
+        extras = {'tick_jitter': self.stats_tick.a_dict(), 'audio_disparo': self.audio.latencia.a_dict(), 'remoto_servidor': self.control.latencia.a_dict()}
+        if self.stream: extras['stream_rasterizado'] = self.stream.ms_raster.a_dict()
+        return extras
+
+    def actualizar_diagnostico(self):
+        """Refresca la tabla; mientras se mide se reprograma cada segundo con un único after pendiente."""
+        if self._after_diag: self.root.after_cancel(self._after_diag); self._after_diag = None # Reiniciar o Medir no suman bucles
+        if not hasattr(self, 'tabla_diag'): return
+        self.tabla_diag.delete(*self.tabla_diag.get_children())
+        for fila in self.perf.filas(self.extras_diagnostico()): self.tabla_diag.insert("", "end", values=fila)
+        d = self.perf.a_dict()
+        txt = f"{'Midiendo' if self.perf.activo else 'Detenido'} · {d['duracion_s']} s"
+        if d['solicitudes_por_frame'] is not None: txt += f" · {d['solicitudes_por_frame']} solicitudes de redibujo por frame"
+        txt += f"\nArranque: {self.arranque.total_ms():.0f} ms · Salidas: {len(self.salidas)} ventana(s)"
+        self.lbl_diag.config(text=txt)
+        if self.perf.activo: self._after_diag = self.root.after(1000, self.actualizar_diagnostico)
+
+    def exportar_diagnostico(self):
+        ruta = filedialog.asksaveasfilename(title="Exportar perfil", defaultextension=".json", initialfile=time.strftime("perfil_%Y%m%d_%H%M%S"),
+                                            filetypes=[("JSON", "*.json"), ("CSV", "*.csv")])
+        if not ruta: return
+        try: self.perf.exportar(ruta, self.extras_diagnostico())
+        except OSError as e: messagebox.showerror("Exportar perfil", str(e))
 
     # --- LÓGICA DE NEGOCIO ---
+
     def update_sound_name(self, idx, new_name):
         self.sonidos[idx]['name'] = new_name
         self.botones_sonido_live[idx].config(text=new_name)
+        self.guardar_biblioteca_luego()
+
+    # Bancos de sonidos (páginas de la biblioteca)
+    def guardar_biblioteca_luego(self, espera_ms=800):
+        """Agrupa varias ediciones seguidas (ej. teclear un nombre) en una sola escritura a disco."""
+        if self._after_guardar_bib: self.root.after_cancel(self._after_guardar_bib)
+        self._after_guardar_bib = self.root.after(espera_ms, self.guardar_biblioteca)
+
+    def guardar_biblioteca(self): self._after_guardar_bib = None; self.biblioteca.guardar()
+
+    def ir_a_banco(self, pagina):
+        """Muestra otra página de 6 efectos; sus clips se decodifican en segundo plano."""
+        self.biblioteca.ir_a(pagina, listo=lambda snd: self.actualizar_slots_sonido())
+        self.sonidos = self.biblioteca.clips()
+        self.actualizar_slots_sonido()
+        self.guardar_biblioteca_luego()
+
+    def nuevo_banco(self): self.ir_a_banco(self.biblioteca.nuevo_banco())
+
+    def renombrar_banco(self, nombre):
+        self.biblioteca.bancos[self.biblioteca.pagina]['nombre'] = nombre
+        self.actualizar_slots_sonido(); self.guardar_biblioteca_luego()
+
+    def cambiar_stream(self, idx):
+        clip = self.sonidos[idx]; clip['stream'] = self.vars_stream[idx].get()
+        if clip['path']:
+            if clip['stream']: self.biblioteca.olvidar(clip['path'])
+            else: self.biblioteca.pedir(clip['path'], lambda snd: self.actualizar_slots_sonido())
+        self.actualizar_slots_sonido(); self.guardar_biblioteca_luego()
+
+    def cambiar_presupuesto_audio(self):
+        try: self.biblioteca.presupuesto_mb = int(self.var_presupuesto.get())
+        except (tk.TclError, ValueError): return
+        self.biblioteca.desalojar(); self.actualizar_slots_sonido(); self.guardar_biblioteca_luego()
+
+    def actualizar_slots_sonido(self):
+        """Sincroniza botones, filas de configuración y uso de memoria con la página activa."""
+        bib = self.biblioteca; n = len(bib.bancos)
+        self.lbl_banco_live.config(text=f"{bib.bancos[bib.pagina]['nombre']} ({bib.pagina + 1}/{n})")
+        if not hasattr(self, 'cb_banco'): return # Pestaña SONIDOS aún no construida
+        self.cb_banco.config(values=[b['nombre'] for b in bib.bancos]); self.cb_banco.current(bib.pagina)
+        if self.en_banco.get() != bib.bancos[bib.pagina]['nombre']:
+            self.en_banco.delete(0, "end"); self.en_banco.insert(0, bib.bancos[bib.pagina]['nombre'])
+        for i, clip in enumerate(self.sonidos):
+            self.botones_sonido_live[i].config(text=clip['name'])
+            if self.entries_sonido[i].get() != clip['name']:
+                self.entries_sonido[i].delete(0, "end"); self.entries_sonido[i].insert(0, clip['name'])
+            self.vars_stream[i].set(clip['stream'])
+            if not clip['path']: self.lbls_sonido[i].config(text="Vacío", fg="#666")
+            elif bib.es_stream(clip): self.lbls_sonido[i].config(text="⏵ " + os.path.basename(clip['path']), fg="#8cf")
+            elif bib.obtener(clip['path']) is not None: self.lbls_sonido[i].config(text=os.path.basename(clip['path']), fg="#afa")
+            elif clip['path'] in bib.pendientes: self.lbls_sonido[i].config(text="⏳ Cargando…", fg="#fea")
+            else: self.lbls_sonido[i].config(text="(en disco) " + os.path.basename(clip['path']), fg="#888")
+        self.lbl_mem_audio.config(text=f"en uso {bib.en_uso / 1048576:.0f} MB · {len(bib.decodificados)} clips")
         
     def cargar_sonido(self, idx):
         path = filedialog.askopenfilename(filetypes=[("Audio", "*.mp3 *.wav *.ogg")])
-        if path:
-            self.sonidos[idx]['path'] = path
-            try:
-                if AUDIO_ENABLED:
-                    self.sonidos[idx]['obj'] = pygame.mixer.Sound(path)
-                    self.sonidos[idx]['lbl_widget'].config(text=os.path.basename(path), fg="#afa")
-            except: pass
+        if path: self.cargar_sonido_async(idx, path)
+
+    def cargar_sonido_async(self, idx, path):
+        """Asigna el archivo al slot; si no es stream se decodifica en el pool (el botón sigue usable)."""
+        clip = self.sonidos[idx]
+        if clip['path'] and clip['path'] != path: self.biblioteca.olvidar(clip['path'])
+        clip['path'] = path
+        try: clip['stream'] = os.path.getsize(path) > BibliotecaSonidos.UMBRAL_STREAM
+        except OSError: pass
+        self.guardar_biblioteca_luego()
+        if self.audio.activo and not clip['stream']:
+            self.biblioteca.pedir(path, lambda snd: self.actualizar_slots_sonido())
+        self.actualizar_slots_sonido()
+
+    def aplicar_mezclador(self):
+        """Reinicia el mezclador con los parámetros elegidos y vuelve a decodificar la página activa."""
+        self.audio.frecuencia = int(self.cb_mix_freq.get()); self.audio.buffer = int(self.cb_mix_buf.get()); self.audio.canales = int(self.cb_mix_ch.get())
+        self.biblioteca.vaciar() # Los Sound quedan ligados al formato del mezclador anterior
+        self.audio.latencia.reiniciar()
+        ok = self.audio.iniciar()
+        self.lbl_latencia.config(text=self.audio.resumen() if ok else "Sin dispositivo de audio")
+        if ok: self.ir_a_banco(self.biblioteca.pagina)
             
     def play_sound(self, idx):
         """Reproduce un sonido y anima el botón en el panel."""
-        snd = self.sonidos[idx]['obj']
-        if snd:
-            snd.stop(); snd.play()
-            orig = self.botones_sonido_live[idx].cget("bg")
-            self.botones_sonido_live[idx].config(bg="#00d4ff")
-            self.root.after(200, lambda: self.botones_sonido_live[idx].config(bg=orig))
+        t0 = time.perf_counter() # Inicio del callback: base para medir la latencia de disparo
+        clip = self.sonidos[idx]
+        if not clip['path'] or not self.audio.activo: return
+        if self.biblioteca.es_stream(clip):
+            try: self.audio.disparar_stream(clip['path'], t0)
+            except pygame.error: return
+        else:
+            snd = self.biblioteca.obtener(clip['path'])
+            if snd is None: # Desalojado o aún decodificando: suena en cuanto esté listo
+                self.biblioteca.pedir(clip['path'], lambda snd: snd and self.audio.disparar(idx, snd, t0))
+                return
+            self.audio.disparar(idx, snd, t0)
+        orig = self.botones_sonido_live[idx].cget("bg")
+        self.botones_sonido_live[idx].config(bg="#00d4ff")
+        self.root.after(200, lambda: (self.botones_sonido_live[idx].config(bg=orig), hasattr(self, 'lbl_latencia') and self.lbl_latencia.config(text=self.audio.resumen())))
             
     def cambiar_pos_timer(self, event):
-        self.timer_position = self.combo_timer.get(); self.redibujar_pantalla()
+        self.timer_position = self.combo_timer.get(); self.anotar('diseno', attr='timer_position', v=self.timer_position); self.solicitar_redibujo()
         
     def dibujar_tiras_equipos(self):
-        """Dibuja los controles de cada equipo en la pestaña EN VIVO."""
-        for widget in self.frame_container_eq.winfo_children(): widget.destroy()
-        self.lbls_puntos_ctrl = []; self.entries_nombres = []
-        
+        """Muestra una tira de controles por equipo en la pestaña EN VIVO.
+
+        Las tiras se reutilizan: al bajar el número de equipos solo se ocultan, y al subirlo se vuelven
+        a mostrar con los datos actuales. Solo se crean widgets para equipos que nunca existieron.
+        Con más de 4 equipos se reparten en dos columnas.
+        """
+        if not hasattr(self, 'tiras_equipos'): self.tiras_equipos = []; self.lbls_puntos_ctrl = []; self.entries_nombres = []
+        cols = 1 if len(self.equipos) <= 4 else 2
+        for c in range(2): self.frame_container_eq.columnconfigure(c, weight=1 if c < cols else 0, uniform="tiras")
         for i, eq in enumerate(self.equipos):
-            fr = tk.Frame(self.frame_container_eq, bg="#333", pady=5); fr.pack(fill="x", pady=2)
+            if i < len(self.tiras_equipos):
+                self.sincronizar_tira(i); self.tiras_equipos[i].grid(row=i // cols, column=i % cols, sticky="ew", padx=1, pady=2)
+                continue
+            fr = tk.Frame(self.frame_container_eq, bg="#333", pady=5); fr.grid(row=i // cols, column=i % cols, sticky="ew", padx=1, pady=2)
+            self.tiras_equipos.append(fr)
             
             # Nombre Editable
             en = tk.Entry(fr, bg="#222", fg="white", font=("Arial", 11, "bold"), justify="center")
-            en.insert(0, eq['nombre']); en.pack(side="top", fill="x", padx=5)
+            en.insert(0, eq.nombre); en.pack(side="top", fill="x", padx=5)
             en.bind("<KeyRelease>", lambda event, idx=i: self.actualizar_nombre_live(idx, event))
             self.entries_nombres.append(en)
             
@@ -323,144 +2462,447 @@ class ImproMatchApp:
             
             # Control Puntos
             tk.Button(f_ctrl, text="-", width=3, bg="#444", fg="white", command=lambda x=i: self.mod(x, -1, 'p')).pack(side="left")
-            l = tk.Label(f_ctrl, text=str(eq['puntos']), font=("Impact", 16), width=3, bg="#333", fg="#00d4ff")
+            l = tk.Label(f_ctrl, text=str(eq.puntos), font=("Impact", 16), width=3, bg="#333", fg="#00d4ff")
             l.pack(side="left", padx=5); self.lbls_puntos_ctrl.append(l)
             tk.Button(f_ctrl, text="+", width=3, bg="#444", fg="white", command=lambda x=i: self.mod(x, 1, 'p')).pack(side="left")
             
             # Control Faltas
             tk.Button(f_ctrl, text="FALTA", bg="#d44", fg="white", font=("Arial", 8, "bold"), command=lambda x=i: self.mod(x, 1, 'f')).pack(side="right")
             tk.Button(f_ctrl, text="quitar", bg="#444", fg="#aaa", font=("Arial", 7), command=lambda x=i: self.mod(x, -1, 'f')).pack(side="right", padx=2)
+        for fr in self.tiras_equipos[len(self.equipos):]: fr.grid_remove()
+
+    def sincronizar_tira(self, idx):
+        """Copia nombre y puntos del modelo a la tira de un equipo (sin tocar lo que ya coincide)."""
+        eq = self.equipos[idx]; en = self.entries_nombres[idx]
+        if en.get() != eq.nombre: en.delete(0, "end"); en.insert(0, eq.nombre)
+        self.lbls_puntos_ctrl[idx].config(text=str(eq.puntos))
+
+    def actualizar_nombre_live(self, idx, event): self.equipos[idx].nombre = self.entries_nombres[idx].get() # Sin cambio real no se publica nada
+    def actualizar_estructura_equipos(self): self.reconstruir_equipos_data()
+
+    # --- TORNEO ---
+    def fila_tabla(self, i):
+        f = self.torneo.filas[i]
+        self.tabla_torneo.item(str(i), values=(self.torneo.posicion(i), self.equipos[i].nombre, f['puntos'], f['faltas'], f['ganadas']))
+
+    def dibujar_tabla_torneo(self):
+        """Rellena la tabla y la lista de rondas desde cero (al cambiar de modo, de equipos o al cerrar una ronda)."""
+        self.tabla_torneo.delete(*self.tabla_torneo.get_children())
+        if self.torneo.activo:
+            for i in self.torneo.orden: self.tabla_torneo.insert("", "end", iid=str(i)); self.fila_tabla(i)
+        self.lista_rondas.delete(0, "end")
+        for k, ronda in enumerate(self.torneo.rondas):
+            self.lista_rondas.insert("end", f"R{k+1}: " + "  ·  ".join(f"{r['nombre']} {r['puntos']}" for r in sorted(ronda, key=lambda r: -r['puntos'])))
+        self.lbl_ronda.config(text=f"Ronda {len(self.torneo.rondas) + 1}" if self.torneo.activo else "")
+
+    def cambiar_modo_torneo(self):
+        if self.var_torneo.get():
+            nuevo = not self.torneo.rondas or messagebox.askyesno("Torneo", "¿Empezar un torneo nuevo?\n(No = continuar con las rondas ya jugadas)")
+            if nuevo: self.torneo.iniciar()
+            else: self.torneo.activo = True
+            self.anotar('torneo', activo=True, nuevo=nuevo)
+        else:
+            self.torneo.activo = False; self.anotar('torneo', activo=False)
+        self.dibujar_tabla_torneo(); self.solicitar_redibujo()
+
+    def cerrar_ronda(self):
+        """Guarda la ronda en juego en la tabla y deja puntos y faltas en cero para la siguiente."""
+        if not self.torneo.activo: return
+        if not messagebox.askyesno("Torneo", f"¿Cerrar la ronda {len(self.torneo.rondas) + 1}?"): return
+        if self.corriendo: self.pausar_tiempo()
+        self.anotar('ronda') # Antes que los ceros: al reproducir el diario, la ronda se cierra con sus puntos
+        self.torneo.cerrar_ronda()
+        self.diario.snapshot(DiarioMatch.capturar(self))
+        self.dibujar_tabla_torneo(); self.solicitar_redibujo()
+
+    # --- OYENTES DEL MODELO (Match.suscribir) ---
+    def tablero_al_cambiar(self, idx, campo, valor, anterior):
+        if campo == 'equipos':
+            for motor in self.motores(): motor.podar_escena(valor)
+            self.solicitar_redibujo()
+        else: self.solicitar_redibujo(equipo=idx)
 
-    def actualizar_nombre_live(self, idx, event): self.equipos[idx]['nombre'] = self.entries_nombres[idx].get(); self.redibujar_pantalla()
-    def actualizar_estructura_equipos(self): self.reconstruir_equipos_data(); self.dibujar_tiras_equipos(); self.redibujar_pantalla()
+    def panel_al_cambiar(self, idx, campo, valor, anterior):
+        if campo == 'equipos':
+            if self.num_equipos_var.get() != valor: self.num_equipos_var.set(valor)
+            self.dibujar_tiras_equipos()
+        elif idx < len(self.tiras_equipos): self.sincronizar_tira(idx)
+
+    def tabla_al_cambiar(self, idx, campo, valor, anterior):
+        """Actualiza en la tabla del torneo solo la fila cambiada y las posiciones que se movieron."""
+        if not self.torneo.activo or not hasattr(self, 'tabla_torneo'): return # Pestaña TORNEO aún no construida
+        if campo == 'equipos': self.dibujar_tabla_torneo(); return
+        self.fila_tabla(idx)
+        for pos, i in enumerate(self.torneo.orden):
+            if self.tabla_torneo.index(str(i)) != pos: self.tabla_torneo.move(str(i), "", pos)
+            if self.tabla_torneo.set(str(i), "pos") != str(pos + 1): self.tabla_torneo.set(str(i), "pos", pos + 1)
+
+    def diario_al_cambiar(self, idx, campo, valor, anterior):
+        if campo == 'equipos': self.anotar('equipos', n=valor)
+        else: self.anotar('equipo', i=idx, campo=campo, v=valor)
     
     # Manejo de Archivos (Fondo/Logo)
     def cambiar_fondo(self):
         path = filedialog.askopenfilename(filetypes=[("Imágenes", "*.jpg *.png *.jpeg")])
-        if path: self.fondo_path = path; 
-        if hasattr(self, 'pil_img_orig'): del self.pil_img_orig
-        self.redibujar_pantalla()
+        if path: self.cargar_imagen_async('fondo', path)
     def cambiar_logo(self):
         path = filedialog.askopenfilename(filetypes=[("Imágenes", "*.png *.jpg")])
-        if path:
-            self.logo_path = path
-            if hasattr(self, 'pil_logo_orig'): del self.pil_logo_orig
-            self.redibujar_pantalla()
-    def quitar_logo(self): self.logo_path = None; self.redibujar_pantalla()
+        if path: self.cargar_imagen_async('logo', path)
+    def quitar_logo(self): self.logo_path = None; self.anotar('imagen', destino='logo', path=None); self.solicitar_redibujo()
     
+    # --- PRESETS DE SHOW ---
+    def guardar_preset(self):
+        """Hornea el diseño actual: fondo y logo se redimensionan en el pool al tamaño de cada salida abierta."""
+        nombre = BibliotecaPresets.limpiar(simpledialog.askstring("Guardar preset", "Nombre del preset:", initialvalue=self.cb_preset.get(), parent=self.root) or "")
+        if not nombre: return
+        bib = self.biblioteca
+        datos = BibliotecaPresets.capturar(self, banco=json.loads(json.dumps(bib.bancos[bib.pagina])))
+        tamanos = sorted({m.destino.tamano() for _, m in self.salidas} | ({self.stream.destino.tamano()} if self.stream else set()))
+        trabajos = []
+        if self.fondo_path: trabajos.append((self.fondo_path, lambda orig: [(t, 1.0) for t in tamanos]))
+        if self.logo_path:
+            escala = self.logo_scale
+            trabajos.append((self.logo_path, lambda orig: [(tam_logo(orig.size, t[1], escala), escala) for t in tamanos]))
+        self.trabajo_img(+1, f"Horneando preset {nombre}…")
+        def listo(fut):
+            if fut.exception() is not None: self.trabajo_img(-1, f"⚠ No se pudo guardar el preset: {fut.exception()}"); return
+            self.trabajo_img(-1, f"✔ Preset {nombre} guardado")
+            self.cb_preset.config(values=self.presets.nombres()); self.cb_preset.set(nombre)
+        self.pool.submit(self.presets.guardar, nombre, datos, trabajos).add_done_callback(lambda f: self.en_hilo_ui(listo, f))
+
+    def borrar_preset(self):
+        nombre = self.cb_preset.get()
+        if not nombre or not messagebox.askyesno("Presets", f"¿Borrar el preset '{nombre}'?"): return
+        try: self.presets.borrar(nombre)
+        except OSError as e: messagebox.showwarning("Presets", f"No se pudo borrar el preset '{nombre}': {e}"); return
+        self.cb_preset.config(values=self.presets.nombres()); self.cb_preset.set("")
+
+    def aplicar_preset(self, nombre):
+        """Mapea el preset en el pool; en el hilo de Tk instala las imágenes y aplica todo en un solo redibujo."""
+        if not nombre: return
+        self.trabajo_img(+1, f"Cargando preset {nombre}…")
+        self.pool.submit(self.presets.leer, nombre).add_done_callback(lambda f: self.en_hilo_ui(self._instalar_preset, nombre, f))
+
+    def _instalar_preset(self, nombre, fut):
+        if fut.exception() is not None: self.trabajo_img(-1, f"⚠ No se pudo cargar el preset {nombre}"); return
+        cab, imagenes = fut.result()
+        ventanas = {m.destino.tamano() for _, m in self.salidas}
+        stream = {self.stream.destino.tamano()} if self.stream else set()
+        def usa(tamanos, tam, escala, original): # ¿Alguna salida de estos tamaños dibuja esta variante (fondo o logo)?
+            return any(tam == CacheImagenes.normalizar(t) or tam == CacheImagenes.normalizar(tam_logo(original, t[1], escala)) for t in tamanos)
+        for path, tam, escala, original, img in imagenes: # Aciertos de caché: el redibujo no redimensiona nada
+            # Cada PhotoImage cuesta en el hilo de Tk: solo las de ventanas abiertas; otros tamaños salen de cercana()
+            if usa(ventanas, tam, escala, original): self.motor.cache_img.instalar(path, tam, escala, img, original)
+            else: self.motor.cache_img.medidas[path] = tuple(original)
+            if usa(stream, tam, escala, original): self.stream.motor.cache_img.instalar(path, tam, escala, img, original)
+        self.aplicar_diseno_preset(cab)
+        banco = cab.get('banco')
+        if banco and len(banco.get('clips', [])) == BibliotecaSonidos.SLOTS:
+            bancos = self.biblioteca.bancos
+            pagina = next((k for k, b in enumerate(bancos) if b['nombre'] == banco['nombre']), None)
+            if pagina is None: bancos.append(banco); pagina = len(bancos) - 1
+            else: bancos[pagina] = banco # El preset trae los clips tal como estaban al guardarlo
+            self.ir_a_banco(pagina)
+        self.sincronizar_diseno()
+        self.diario.snapshot(DiarioMatch.capturar(self)) # Un registro por preset, no uno por atributo
+        self.solicitar_redibujo()
+        self.trabajo_img(-1, f"✔ Preset {nombre}")
+
+    def sincronizar_diseno(self):
+        """Lleva los controles de DISEÑO (si ya se construyeron) a los valores actuales del modelo."""
+        if not hasattr(self, 'sliders_diseno'): return
+        for attr, sl in self.sliders_diseno.items(): sl.set(getattr(self, attr))
+        self.combo_timer.set(self.timer_position)
+        self.cb_fuente_nombres.set(self.font_family); self.cb_fuente_puntos.set(self.font_score)
+
     # --- PANTALLA COMPLETA INTELIGENTE ---
     def toggle_full_event(self, event=None):
-        """Activa/Desactiva el modo sin bordes maximizado en el monitor actual."""
-        if self.is_fullscreen:
-            self.win_proj.overrideredirect(False)
-            self.win_proj.state('normal')
-            self.is_fullscreen = False
+        """Activa/Desactiva el modo sin bordes maximizado en el monitor actual (para la ventana del evento)."""
+        ventana = event.widget.winfo_toplevel() if event is not None else self.win_proj
+        if ventana.overrideredirect():
+            ventana.overrideredirect(False)
+            ventana.state('normal')
         else:
-            self.win_proj.overrideredirect(True)
-            self.win_proj.state('zoomed') 
-            self.is_fullscreen = True
-
-    # --- MOTOR DE RENDERIZADO (CANVAS) ---
-    def create_rounded_rect(self, x1, y1, x2, y2, radius=25, **kwargs):
-        """Dibuja un polígono con esquinas redondeadas."""
-        points = [x1+radius, y1, x1+radius, y1, x2-radius, y1, x2-radius, y1, x2, y1, x2, y1+radius, x2, y1+radius, x2, y2-radius, x2, y2-radius, x2, y2, x2-radius, y2, x2-radius, y2, x1+radius, y2, x1+radius, y2, x1, y2, x1, y2-radius, x1, y2-radius, x1, y1+radius, x1, y1+radius, x1, y1]
-        return self.canvas.create_polygon(points, **kwargs, smooth=True)
-
-    def draw_text_multiline(self, x, y, text, font, fill, max_width):
-        """Dibuja texto con ajuste automático de línea y outline opcional."""
-        if self.var_outline.get():
-             for ox in [-2, 0, 2]:
-                for oy in [-2, 0, 2]:
-                    if ox!=0 or oy!=0: self.canvas.create_text(x+ox, y+oy, text=text, font=font, fill="black", width=max_width, justify="center")
-        self.canvas.create_text(x, y, text=text, font=font, fill=fill, width=max_width, justify="center")
+            ventana.overrideredirect(True)
+            ventana.state('zoomed') 
 
-    def redibujar_pantalla(self, event=None):
-        """Dibuja todos los elementos en el Canvas del proyector."""
-        self.canvas.delete("all")
+    # --- TRABAJO EN SEGUNDO PLANO ---
+    def en_hilo_ui(self, fn, *args):
+        """Encola 'fn(*args)' para ejecutarse en el hilo de Tk (seguro desde cualquier hilo)."""
+        self.cola_ui.put((fn, args))
+
+    def drenar_cola_ui(self):
+        while True:
+            try: fn, args = self.cola_ui.get_nowait()
+            except queue.Empty: break
+            try: fn(*args)
+            except Exception as e: print(f"Error aplicando resultado en segundo plano: {e}")
+        self.root.after(20, self.drenar_cola_ui)
+
+    def drenar_comandos(self):
+        """Aplica por lotes los comandos remotos pendientes (poll corto: la latencia añadida es < 5 ms)."""
+        try:
+            if self.control.drenar(self.ejecutar_comando) and time.monotonic() - self._t_lbl_remoto >= 1.0:
+                self._t_lbl_remoto = time.monotonic() # resumen() ordena las muestras: como mucho una vez por segundo
+                self.lbl_remoto.config(text=f"{self.control.latencia.resumen()} · {self.control.host}:{self.control.puerto}")
+        finally: self.root.after(5, self.drenar_comandos) # El poll sigue aunque algo falle
+
+    def poner_tiempo(self, segundos):
+        """Comando 'tiempo': pasa por las mismas entradas que el operador (SET)."""
+        m, sg = divmod(int(segundos), 60)
+        self.e_min.delete(0, "end"); self.e_min.insert(0, str(m)); self.e_sec.delete(0, "end"); self.e_sec.insert(0, f"{sg:02d}")
+        self.set_tiempo()
+
+    def cargar_imagen_async(self, destino, path):
+        """Decodifica y redimensiona en el pool. El tablero muestra la imagen anterior hasta el cambio."""
+        self.motor.cache_img.olvidar(path)
         w = self.win_proj.winfo_width(); h = self.win_proj.winfo_height()
-        
-        # 1. Fondo
-        if self.fondo_path:
-            if not hasattr(self, 'pil_img_orig'): self.pil_img_orig = Image.open(self.fondo_path)
-            img_r = self.pil_img_orig.resize((w, h), Image.Resampling.LANCZOS)
-            self.tk_bg = ImageTk.PhotoImage(img_r)
-            self.canvas.create_image(0, 0, image=self.tk_bg, anchor="nw")
+        if destino == 'fondo': tamanos = lambda orig: [((w, h), 1.0)]
+        else:
+            escala = self.logo_scale
+            tamanos = lambda orig: [(tam_logo(orig.size, h, escala), escala)]
+        nombre = os.path.basename(path)
+        self.trabajo_img(+1, f"Cargando {nombre}…")
+        def listo(err):
+            if err is not None: self.trabajo_img(-1, f"⚠ No se pudo cargar {nombre}"); return
+            setattr(self, f"{destino}_path", path) # Cambio atómico en el hilo de Tk
+            self.anotar('imagen', destino=destino, path=path)
+            self.trabajo_img(-1, f"✔ {nombre}")
+            self.solicitar_redibujo()
+        self.motor.cache_img.precargar(path, tamanos, listo)
 
-        # 2. Logo
-        if self.logo_path:
-            if not hasattr(self, 'pil_logo_orig'): self.pil_logo_orig = Image.open(self.logo_path)
-            base_logo_size = h * 0.2 * self.logo_scale
-            aspect = self.pil_logo_orig.width / self.pil_logo_orig.height
-            new_w = int(base_logo_size * aspect); new_h = int(base_logo_size)
-            img_l = self.pil_logo_orig.resize((new_w, new_h), Image.Resampling.LANCZOS)
-            self.tk_logo = ImageTk.PhotoImage(img_l)
-            lx = w * 0.5; ly = (h * 0.5) + (h * self.logo_offset_y)
-            self.canvas.create_image(lx, ly, image=self.tk_logo, anchor="center")
+    def trabajo_img(self, delta, texto):
+        self.trabajos_img += delta
+        if not hasattr(self, 'lbl_estado_img'): return # Pestaña DISEÑO aún no construida
+        self.lbl_estado_img.config(text=texto)
+        if self.trabajos_img > 0: self.pb_img.start(15)
+        else: self.pb_img.stop()
 
-        # Configuración Base
-        base_font = int(h * 0.05 * self.scale_factor)
-        cx = w * 0.5 + (w * self.offset_x)
-        
-        cy_equipos = (h * 0.5) + (h * self.offset_global_y)
-        if self.timer_position == "Arriba": cy_timer = (h * 0.15)
-        else: cy_timer = (h * 0.85)
-        cy_timer += (h * self.offset_timer)
+    # --- INTERACCIÓN EN CURSO (REMUESTREO RÁPIDO) ---
+    def on_configure(self, event=None):
+        """Ignora los <Configure> de widgets hijos y los que no cambian el tamaño (mover, foco)."""
+        if event is not None:
+            if not any(event.widget is v for v, _ in self.salidas): return
+            tamano = (event.width, event.height)
+            if tamano == self._ultimo_tamano.get(event.widget): return
+            self._ultimo_tamano[event.widget] = tamano
+        self.marcar_interaccion(); self.solicitar_redibujo()
 
-        # 3. Timer (Condicional)
-        if self.ver_timer.get():
-            t_w = w * 0.25 * self.scale_factor * self.box_padding; t_h = h * 0.15 * self.scale_factor * self.box_padding
-            min_sec = f"{self.tiempo_restante//60:02d}:{self.tiempo_restante%60:02d}"
-            self.create_rounded_rect(cx-t_w/2, cy_timer-t_h/2, cx+t_w/2, cy_timer+t_h/2, radius=self.corner_radius, fill=self.color_caja)
-            self.canvas.create_text(cx, cy_timer, text=min_sec, fill="white", font=(self.font_score, int(base_font*2.5)))
-
-        # 4. Equipos
-        cols = len(self.equipos); col_w = w / cols
-        for i, eq in enumerate(self.equipos):
-            x = (i * col_w) + (col_w / 2) + (w * self.offset_x)
-            y_nm = cy_equipos - (h * 0.12) + (h * self.offset_names)
-            y_pts_base = cy_equipos + (h * 0.02) + (h * self.offset_scores)
-            
-            # Nombre
-            self.draw_text_multiline(x, y_nm, eq['nombre'], (self.font_family, int(base_font * self.name_scale), "bold"), self.color_nombres, max_width=col_w*0.9)
-            
-            # Puntos
-            p_w = h * 0.2 * self.scale_factor * self.box_padding; p_h = p_w * 0.8
-            self.create_rounded_rect(x-p_w/2, y_pts_base-p_h/2, x+p_w/2, y_pts_base+p_h/2, radius=self.corner_radius, fill=self.color_caja)
-            self.canvas.create_text(x, y_pts_base, text=str(eq['puntos']), fill=self.color_puntos, font=(self.font_score, int(base_font*3)))
-            
-            # Faltas (Condicional)
-            if self.ver_faltas.get():
-                y_flt = y_pts_base + (h * 0.16)
-                f_box_w = p_w * 1.0; f_box_h = p_h * 0.4
-                self.create_rounded_rect(x-f_box_w/2, y_flt-f_box_h/2, x+f_box_w/2, y_flt+f_box_h/2, radius=self.corner_radius, fill=self.color_caja)
-                radius_c = f_box_h * 0.3; gap = radius_c * 0.5; start_x = x - ((radius_c*2 * 3 + gap * 2) / 2) + radius_c
-                for k in range(3):
-                    dot_x = start_x + (k * (radius_c*2 + gap)); color = self.color_faltas if k < eq['faltas'] else "#333"
-                    self.canvas.create_oval(dot_x-radius_c, y_flt-radius_c, dot_x+radius_c, y_flt+radius_c, fill=color, outline="")
+    def marcar_interaccion(self, espera_ms=250):
+        """Usa remuestreo barato mientras dure la interacción; al asentarse hace una sola pasada LANCZOS."""
+        self.modo_rapido = True
+        if self._after_asentar: self.root.after_cancel(self._after_asentar)
+        self._after_asentar = self.root.after(espera_ms, self.fin_interaccion)
+
+    def fin_interaccion(self):
+        self._after_asentar = None; self.modo_rapido = False
+        self.solicitar_redibujo()
+
+    # --- PLANIFICADOR DE FOTOGRAMAS ---
+    def solicitar_redibujo(self, equipo=None):
+        """Marca el tablero como sucio. Se renderiza como máximo una vez por fotograma (frame_budget_ms).
+
+        El reloj no pasa por aquí: cada tick llama a refrescar_timer() en el momento exacto.
+        """
+        if equipo is not None: self._sucio_equipos.add(equipo)
+        else: self._sucio_layout = True
+        if self._frame_pendiente: return
+        espera = self.frame_budget_ms - (time.perf_counter() - self._ultimo_frame) * 1000
+        if espera <= 0: self._frame_pendiente = self.root.after_idle(self.render_frame)
+        else: self._frame_pendiente = self.root.after(int(espera) + 1, self.render_frame)
+
+    def render_frame(self):
+        """Consume las marcas acumuladas: un cambio de geometría implica todo; si no, solo lo sucio."""
+        self._frame_pendiente = None
+        equipos = self._sucio_equipos
+        if self._sucio_layout: self.redibujar_pantalla()
+        else:
+            equipos = [idx for idx in equipos if idx < len(self.equipos)]
+            for idx in equipos: self.refrescar_equipo(idx)
+            if equipos and self.web.activo: self.web.publicar({'e': {idx: self.equipos[idx].a_dict() for idx in equipos}})
+            if self.stream: self.stream.publicar()
+        self._sucio_layout = False; self._sucio_equipos = set()
+        if self.perf.activo: self.perf.items.registrar(len(self.canvas.find_all()))
+        self._ultimo_frame = time.perf_counter()
+
+    # --- SALIDAS (el layout y la escena de cada ventana viven en su MotorTablero) ---
+    def motores(self):
+        for _, motor in self.salidas: yield motor
+        if self.stream and self.stream.listo: yield self.stream.motor
+    def redibujar_pantalla(self, event=None):
+        for motor in self.motores(): motor.redibujar_pantalla()
+        if self.stream: self.stream.publicar()
+        if self.web.activo: self.web.publicar({'estado': self.estado_web()}, rutas={'fondo': self.fondo_path, 'logo': self.logo_path})
+    def refrescar_timer(self):
+        for motor in self.motores(): motor.refrescar_timer()
+        if self.stream: self.stream.publicar()
+        if self.web.activo:
+            texto = self.motor.texto_timer()
+            if texto != self._reloj_web: self._reloj_web = texto; self.web.publicar({'t': texto})
+    def refrescar_equipo(self, idx): # Quien llama (render_frame) entrega la escena al stream una vez por frame
+        for motor in self.motores(): motor.refrescar_equipo(idx)
+
+    def abrir_salida(self):
+        """Abre otra ventana de tablero (monitor de escena, TV del lobby) con las cachés del proyector.
+
+        Cada ventana tiene su propia escena retenida, así que los cambios le llegan como deltas
+        (un itemconfig por punto o tick); las imágenes y rótulos se decodifican una sola vez.
+        """
+        win = tk.Toplevel(self.root); win.title(f"Tablero {len(self.salidas) + 1}")
+        win.geometry("640x360"); win.configure(bg="black")
+        cv = tk.Canvas(win, bg="black", highlightthickness=0); cv.pack(fill="both", expand=True)
+        motor = MotorTablero(self, DestinoTk(cv, win), cache_img=self.motor.cache_img, cache_rotulos=self.motor.cache_rotulos)
+        self.motor.cache_img.max_items += 4 # Fondo y logo a otro tamaño (+ versiones rápidas)
+        self.salidas.append((win, motor))
+        if self.perf.activo: self.instrumentar_motor(motor)
+        win.bind("<F11>", self.toggle_full_event); cv.bind("<Double-Button-1>", self.toggle_full_event)
+        win.bind("<Configure>", self.on_configure)
+        win.protocol("WM_DELETE_WINDOW", lambda: self.cerrar_salida(win))
+        self.actualizar_lbl_salidas(); self.solicitar_redibujo()
+
+    def cerrar_salida(self, win):
+        self.salidas = [(v, m) for v, m in self.salidas if v is not win]
+        self._ultimo_tamano.pop(win, None); self.motor.cache_img.max_items -= 4
+        win.destroy(); self.actualizar_lbl_salidas()
+
+    def estado_web(self):
+        """Estado completo para la página web (se manda al conectar y cuando cambia el diseño)."""
+        return {'equipos': [eq.a_dict() for eq in self.equipos], 'reloj': self.motor.texto_timer(),
+                'ver_timer': activo(self.ver_timer), 'ver_faltas': activo(self.ver_faltas), 'timer_arriba': self.timer_position == "Arriba",
+                'colores': {'nombres': self.color_nombres, 'puntos': self.color_puntos, 'faltas': self.color_faltas, 'caja': self.color_caja},
+                'fuentes': [self.font_family, self.font_score],
+                'fondo': os.path.basename(self.fondo_path) if self.fondo_path else None, 'logo': os.path.basename(self.logo_path) if self.logo_path else None}
+
+    def cambiar_web(self):
+        if self.var_web.get():
+            if not self.web.iniciar(): self.var_web.set(False)
+            else: self.redibujar_pantalla() # Primer estado completo para los clientes
+        else: self.pool.submit(self.web.detener) # shutdown() espera al hilo del servidor
+        self.actualizar_lbl_salidas()
+
+    def cambiar_salida_frames(self):
+        """Activa la salida de fotogramas: archivo o FIFO para RGBA crudo, carpeta para la secuencia PNG."""
+        if self.stream: self.stream.detener(); self.stream = None
+        if self.var_frames.get():
+            formato = self.cb_stream_fmt.get()
+            if formato == 'png': ruta = filedialog.askdirectory(title="Carpeta para los fotogramas PNG")
+            else: ruta = filedialog.asksaveasfilename(title="Archivo o FIFO (.fifo) para RGBA crudo", defaultextension=".rgba", confirmoverwrite=False)
+            w, h = SalidaFrames.RESOLUCIONES[self.cb_stream_res.get()]
+            stream = SalidaFrames(self, ruta, w, h, fps=int(self.cb_stream_fps.get()), formato=formato,
+                                  pool=self.pool, en_hilo_ui=self.en_hilo_ui, al_listo=self.solicitar_redibujo, base=self.motor) if ruta else None
+            if stream and stream.iniciar(self.fuentes_disco): self.stream = stream; self.root.after(1000, self.vigilar_stream)
+            else: self.var_frames.set(False)
+        self.actualizar_lbl_salidas()
+
+    def vigilar_stream(self):
+        """Cada segundo, mientras haya stream: FPS en la etiqueta y baja del stream si el lector cerró."""
+        if self.stream is None: return
+        if not self.stream.activo:
+            messagebox.showwarning("Stream", self.stream.resumen()); self.stream = None; self.var_frames.set(False)
+        else: self.root.after(1000, self.vigilar_stream)
+        self.actualizar_lbl_salidas()
+
+    def actualizar_lbl_salidas(self):
+        if not hasattr(self, 'lbl_salidas'): return # Pestaña DISEÑO aún no construida
+        texto = f"{len(self.salidas)} ventana(s)"
+        if self.web.activo: texto += f" · web: http://{'localhost' if self.web.host == '127.0.0.1' else socket.gethostname()}:{self.web.puerto}/"
+        if self.stream: texto += f" · {self.stream.resumen()}"
+        self.lbl_salidas.config(text=texto)
+
+    # --- DIARIO (RECUPERACIÓN) ---
+    def anotar(self, op, **datos):
+        """Anota un cambio en el diario del match (solo encola) y toma instantáneas periódicas."""
+        self.diario.registrar(op, **datos)
+        if self.diario.necesita_snapshot(): self.diario.snapshot(DiarioMatch.capturar(self))
+
+    def anotar_reloj(self): self.anotar('reloj', restante=round(self.restante(), 2), corriendo=self.corriendo)
+
+    def al_cerrar(self):
+        """Cierre ordenado: instantánea final y vaciado del diario antes de destruir las ventanas."""
+        if self.corriendo: self.pausar_tiempo()
+        self.match.desuscribir(self.diario_al_cambiar) # Lo que cambie al destruir las ventanas ya no va a un diario cerrado
+        self.diario.snapshot(DiarioMatch.capturar(self)); self.diario.cerrar()
+        self.control.cerrar(); self.web.detener()
+        if self.stream: self.stream.detener()
+        self.root.destroy()
+
+    def nuevo_match(self):
+        """Pone puntos, faltas y reloj a cero para empezar otro match (lo recuperado queda atrás)."""
+        if not messagebox.askyesno("Nuevo Match", "¿Reiniciar puntos, faltas y cronómetro?"): return
+        if self.corriendo: self.pausar_tiempo()
+        for eq in self.equipos: eq.puntos = 0; eq.faltas = 0
+        self.set_tiempo()
+        self.diario.snapshot(DiarioMatch.capturar(self))
 
     # --- CONTROL DE TIEMPO Y VALORES ---
+    def cambiar_interruptor(self, attr):
+        self.anotar('diseno', attr=attr, v=getattr(self, attr).get())
+        if attr == 'var_decimas': self.refrescar_timer()
+        else: self.solicitar_redibujo()
     def set_font(self, font_name, target):
         if target == 'names': self.font_family = font_name
         else: self.font_score = font_name
-        self.redibujar_pantalla()
-    def upd_lay(self, param, val): setattr(self, param, float(val)); self.redibujar_pantalla()
-    def mod(self, idx, d, type):
-        eq = self.equipos[idx]
-        if type == 'p':
-            if eq['puntos'] + d >= 0: eq['puntos'] += d; self.lbls_puntos_ctrl[idx].config(text=str(eq['puntos']))
-        else:
-            if 0 <= eq['faltas'] + d <= 3: eq['faltas'] += d
-        self.redibujar_pantalla()
+        self.anotar('diseno', attr='font_family' if target == 'names' else 'font_score', v=font_name)
+        self.solicitar_redibujo()
+    def upd_lay(self, param, val):
+        if getattr(self, param) == float(val): return # Ej. Scale.set() al reflejar un preset
+        setattr(self, param, float(val))
+        self.anotar('diseno', attr=param, v=float(val))
+        if param == 'logo_scale': self.marcar_interaccion()
+        self.solicitar_redibujo()
     def set_tiempo(self):
-        try: self.tiempo_restante = int(self.e_min.get())*60 + int(self.e_sec.get()); self.redibujar_pantalla()
-        except: pass
+        try: self.tiempo_restante = int(self.e_min.get())*60 + int(self.e_sec.get())
+        except: return
+        self.stats_tick.reiniciar()
+        if self.corriendo: self._deadline = time.monotonic() + self.tiempo_restante; self.programar_tick()
+        self.anotar_reloj()
+        self.refrescar_timer()
+
+    # --- RELOJ MONOTÓNICO ---
+    # El reloj no cuenta ticks: calcula lo que falta contra un deadline de time.monotonic(), así que
+    # el tiempo de redibujado o un tick tardío nunca se acumulan. Pausar guarda el resto exacto.
+    def restante(self):
+        if self.corriendo and self._deadline is not None: return max(0.0, self._deadline - time.monotonic())
+        return self.tiempo_restante
+
     def iniciar_tiempo(self):
-        if not self.corriendo: self.corriendo = True; self.loop()
-    def pausar_tiempo(self): self.corriendo = False
+        if self.corriendo or self.tiempo_restante <= 0: return
+        self.corriendo = True
+        self._deadline = time.monotonic() + self.tiempo_restante
+        self.anotar_reloj()
+        self.programar_tick()
+
+    def pausar_tiempo(self):
+        if not self.corriendo: return
+        self.tiempo_restante = self.restante(); self.corriendo = False; self._deadline = None
+        if self._after_reloj: self.root.after_cancel(self._after_reloj); self._after_reloj = None
+        self.anotar_reloj()
+        self.refrescar_timer(); self.lbl_jitter.config(text=self.stats_tick.resumen())
+
+    def programar_tick(self):
+        """Agenda el próximo tick justo cuando cambia el texto visible (cada segundo o cada décima)."""
+        if self._after_reloj: self.root.after_cancel(self._after_reloj)
+        rem = self.restante()
+        paso = 0.1 if (self.var_decimas.get() and rem <= 10) else 1.0
+        umbral = (math.ceil(rem / paso - 1e-6) - 1) * paso
+        espera = max(0.0, rem - umbral)
+        self._proximo_tick = time.monotonic() + espera
+        self._after_reloj = self.root.after(max(1, math.ceil(espera * 1000)), self.loop)
+
     def loop(self):
-        if self.corriendo and self.tiempo_restante > 0:
-            self.tiempo_restante -= 1; self.redibujar_pantalla(); self.root.after(1000, self.loop)
-        elif self.tiempo_restante == 0: self.corriendo = False
+        self._after_reloj = None
+        if not self.corriendo: return
+        ahora = time.monotonic()
+        if self._proximo_tick is not None: self.stats_tick.registrar((ahora - self._proximo_tick) * 1000)
+        self.tiempo_restante = max(0.0, self._deadline - ahora)
+        self.refrescar_timer()
+        if self.tiempo_restante > 0:
+            if self.tiempo_restante >= 10 or not self.var_decimas.get(): self.anotar_reloj() # 1 registro por segundo
+            self.programar_tick()
+        else:
+            self.tiempo_restante = 0; self.corriendo = False; self._deadline = None
+            self.anotar_reloj()
+            self.lbl_jitter.config(text=self.stats_tick.resumen())
 
 if __name__ == "__main__":
     ImproMatchApp()
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""
+Pruebas sin pantalla de CacheImagenes con pool: un tamaño que el preset no horneó no decodifica en
+el hilo que dibuja (se muestra la variante más parecida) y un original borrado deja lo horneado.
+
+Uso:
+    python -m pytest -q tests
+"""
+
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+import match_director_source
+from match_director_source import CacheImagenes
+
+class PruebaCacheImagenes(unittest.TestCase):
+    def setUp(self):
+        self.carpeta = tempfile.mkdtemp()
+        self.pool = ThreadPoolExecutor(max_workers=2)
+        self.cola = queue.Queue() # Hace de cola_ui: el hilo de la prueba es el "hilo de Tk"
+        self.cache = CacheImagenes(convertir=lambda i: i, pool=self.pool, en_hilo_ui=lambda fn, *args: self.cola.put((fn, args)))
+        self.ruta = os.path.join(self.carpeta, "fondo.png")
+        Image.new("RGB", (320, 180), (0, 90, 200)).save(self.ruta)
+        self.cache.instalar(self.ruta, (160, 90), 1.0, Image.new("RGBA", (160, 90)), (320, 180)) # Como al aplicar un preset
+
+    def tearDown(self):
+        self.pool.shutdown(wait=True)
+        shutil.rmtree(self.carpeta, ignore_errors=True)
+
+    def drenar(self):
+        fn, args = self.cola.get(timeout=5); fn(*args)
+
+    def test_tamano_no_horneado(self):
+        hilos = []; abrir = Image.open
+        def espia(*a, **k):
+            hilos.append(threading.current_thread()); return abrir(*a, **k)
+        match_director_source.Image.open = espia
+        try:
+            provisoria = self.cache.obtener(self.ruta, (200, 112))
+            self.assertEqual(provisoria.size, (160, 90)) # La horneada, mientras el pool trabaja
+            self.drenar()
+        finally: match_director_source.Image.open = abrir
+        self.assertNotIn(threading.current_thread(), hilos)
+        self.assertEqual(self.cache.obtener(self.ruta, (200, 112)).size, (200, 112))
+
+    def test_original_borrado(self):
+        os.remove(self.ruta) # Ej. la carpeta del show se movió
+        self.assertEqual(self.cache.obtener(self.ruta, (200, 112)).size, (160, 90))
+        self.drenar()
+        self.assertIn(self.ruta, self.cache.faltantes)
+        self.assertEqual(self.cache.obtener(self.ruta, (200, 112)).size, (160, 90))
+        self.assertEqual(self.cache.medida(self.ruta), (320, 180))
+
+if __name__ == "__main__":
+    unittest.main()
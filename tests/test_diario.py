@@ -0,0 +1,83 @@
+"""
+Pruebas sin pantalla del diario del match (DiarioMatch): reproducción de instantánea + cola,
+última línea truncada por un corte, y recuperación con una imagen que ya no existe.
+
+Uso:
+    python -m pytest -q tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from match_director_source import DiarioMatch, EstadoTablero, MotorTablero, DestinoGrabacion, CacheImagenes
+
+class PruebaDiario(unittest.TestCase):
+    def setUp(self):
+        self.carpeta = tempfile.mkdtemp()
+        self.dir_diario = os.path.join(self.carpeta, "diario")
+
+    def tearDown(self):
+        shutil.rmtree(self.carpeta, ignore_errors=True)
+
+    def imagen(self, nombre):
+        ruta = os.path.join(self.carpeta, nombre)
+        Image.new("RGB", (64, 36), (200, 0, 0)).save(ruta)
+        return ruta
+
+    def escribir(self, modelo, registros):
+        """Instantánea de 'modelo' seguida de 'registros' (op, datos), con el escritor real."""
+        diario = DiarioMatch(self.dir_diario, intervalo_lote=0)
+        diario.iniciar(); diario.snapshot(DiarioMatch.capturar(modelo))
+        for op, datos in registros: diario.registrar(op, **datos)
+        diario.cerrar()
+
+    def recuperar(self):
+        modelo = EstadoTablero(n_equipos=0)
+        return modelo, DiarioMatch(self.dir_diario).recuperar(modelo)
+
+    def test_instantanea_y_cola(self):
+        m = EstadoTablero(n_equipos=3); m.equipos[0].puntos = 4
+        self.escribir(m, [('equipo', dict(i=1, campo='puntos', v=7)), ('equipos', dict(n=4)), ('equipo', dict(i=3, campo='nombre', v="NARANJA")),
+                          ('reloj', dict(restante=95.5, corriendo=False)), ('diseno', dict(attr='color_puntos', v="#ff0000"))])
+        r, hubo = self.recuperar()
+        self.assertTrue(hubo)
+        self.assertEqual([eq.puntos for eq in r.equipos], [4, 7, 0, 0])
+        self.assertEqual(r.equipos[3].nombre, "NARANJA")
+        self.assertEqual(r.tiempo_restante, 95.5)
+        self.assertEqual(r.color_puntos, "#ff0000")
+
+    def test_ultima_linea_truncada(self):
+        self.escribir(EstadoTablero(n_equipos=2), [('equipo', dict(i=0, campo='puntos', v=2))])
+        with open(os.path.join(self.dir_diario, "diario.jsonl"), "a", encoding="utf-8") as f: f.write('{"s":99,"op":"equi')
+        r, hubo = self.recuperar()
+        self.assertTrue(hubo)
+        self.assertEqual([eq.puntos for eq in r.equipos], [2, 0])
+
+    def test_imagen_faltante(self):
+        m = EstadoTablero(n_equipos=2); m.fondo_path = self.imagen("fondo.png")
+        logo = self.imagen("logo.png")
+        self.escribir(m, [('imagen', dict(destino='logo', path=logo))])
+        os.remove(m.fondo_path); os.remove(logo) # Ej. el pendrive ya no está
+        r, hubo = self.recuperar()
+        self.assertTrue(hubo)
+        self.assertIsNone(r.fondo_path); self.assertIsNone(r.logo_path)
+        MotorTablero(r, DestinoGrabacion(640, 360)).redibujar_pantalla()
+
+    def test_imagen_faltante_en_el_redibujo(self):
+        """Si el archivo desaparece con el programa abierto, se oculta el ítem y el redibujo sigue."""
+        m = EstadoTablero(n_equipos=2); m.fondo_path = os.path.join(self.carpeta, "no_existe.jpg"); m.logo_path = m.fondo_path
+        destino = DestinoGrabacion(640, 360); motor = MotorTablero(m, destino)
+        motor.redibujar_pantalla()
+        self.assertNotIn(('fondo',), motor.escena); self.assertNotIn(('logo',), motor.escena)
+        self.assertIn(('puntos', 0), motor.escena)
+        self.assertIsNone(CacheImagenes(convertir=lambda i: i).obtener(m.fondo_path, (10, 10)))
+
+if __name__ == "__main__":
+    unittest.main()